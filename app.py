@@ -1,55 +1,162 @@
 # app.py
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Blueprint, Flask, Response, current_app, g, render_template, request, jsonify, send_file
 from datetime import datetime
-from scoring import IMPValidator, IMPScorer
-from pdf_generator import IMPReportGenerator
-from config import OBSERVED_ITEMS, PROVOKED_ITEMS, ALL_ITEMS, TEST_SECTIONS
-import logging
+from itsdangerous import URLSafeTimedSerializer, BadSignature, SignatureExpired
+from scoring import IMPValidator, VectorizedIMPScorer, EvaluationResult
+from storage import EvaluationStore
+from form_page import get_form_page
+from instrumentation import ENABLED as METRICS_ENABLED, observe_request, render_prometheus
+from logging_setup import REQUEST_ID_HEADER, bind_request_id, clear_request_context, configure_logging, get_logger
+from result_cache import cache_stats, evaluate_cached, open_result_report
+from trajectory import build_trajectory
+from vector_scoring import parse_matrix, response_matrix
+from config import (
+    ITEM_CATALOG, MAX_BATCH_SIZE, RESULT_TOKEN_MAX_AGE, REPORT_JOBS, EVALUATION_STORE, SCORING_ONLY
+)
+import atexit
 import io
-from reportlab.pdfgen import canvas
+import numpy as np
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, Any
 
-# Configuración de logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger(__name__)
+logger = get_logger('imp.app')
+
+# Las rutas se registran en blueprints; la aplicación se construye en create_app().
+# Las rutas de informes PDF van aparte para poder desplegar workers sólo de puntuación,
+# y los módulos que dependen de ReportLab se importan en su primer uso.
+bp = Blueprint('imp', __name__)
+reports_bp = Blueprint('imp_reports', __name__)
 
-app = Flask(__name__)
 
 # Inyectamos el año actual en todas las plantillas
-@app.context_processor
+@bp.app_context_processor
 def inject_year():
     return {'current_year': datetime.now().year}
 
+
 # Clase para manejar errores de la aplicación
 class IMPError(Exception):
     pass
 
-@app.route('/form')
-def evaluation_form():
-    """Ruta que muestra el formulario de evaluación"""
+
+def _result_serializer() -> URLSafeTimedSerializer:
+    return URLSafeTimedSerializer(current_app.config['SECRET_KEY'], salt='imp-evaluation-result')
+
+
+def sign_result(result: EvaluationResult) -> str:
+    """Firma un resultado de evaluación para que el cliente pueda pedir su informe después"""
+    return _result_serializer().dumps(result.to_dict())
+
+
+def load_result(token: str) -> EvaluationResult:
+    """Recupera un resultado firmado por /evaluate, rechazando tokens alterados o caducados"""
     try:
-        return render_template(
-            'form.html',
-            observed_items=[item for item_name, item in ALL_ITEMS.items() if item_name in OBSERVED_ITEMS],
-            provoked_items=[item for item_name, item in ALL_ITEMS.items() if item_name in PROVOKED_ITEMS]
+        return EvaluationResult.from_dict(
+            _result_serializer().loads(token, max_age=RESULT_TOKEN_MAX_AGE)
         )
+    except SignatureExpired:
+        raise IMPError("El resultado ha caducado, vuelva a evaluar el formulario")
+    except (BadSignature, KeyError, TypeError):
+        raise IMPError("Token de resultado no válido")
+
+
+def result_from_request() -> EvaluationResult:
+    """
+    Obtiene el resultado a renderizar: el firmado por /evaluate (campo result_token) o,
+    si no se envía token o no es válido, el formulario recibido validado y puntuado una sola vez.
+    """
+    data = request.form.to_dict()
+    token = data.pop('result_token', None)
+    if token:
+        try:
+            return load_result(token)
+        except IMPError as e:
+            if not data:
+                raise
+            logger.warning("Token de resultado rechazado; se puntúa el formulario recibido", error=str(e))
+
+    responses, errors = IMPValidator.parse_form_data(data)
+    if errors:
+        raise IMPError('; '.join(errors))
+    return evaluate_cached(VectorizedIMPScorer(), data, responses)
+
+
+_report_queue = None
+_report_queue_lock = threading.Lock()
+
+
+def get_report_queue():
+    """Cola de informes del proceso, creada en el primer uso"""
+    global _report_queue
+    with _report_queue_lock:
+        if _report_queue is None:
+            from report_jobs import ReportJobQueue
+            _report_queue = ReportJobQueue(
+                cache_dir=REPORT_JOBS['cache_dir'] or os.path.join(tempfile.gettempdir(), 'imp_reports'),
+                max_workers=REPORT_JOBS['workers'],
+                cache_ttl=REPORT_JOBS['cache_ttl'],
+                max_entries=REPORT_JOBS['max_entries']
+            )
+            # gunicorn lo cierra en worker_exit; atexit cubre el resto de servidores
+            atexit.register(_report_queue.shutdown)
+        return _report_queue
+
+_evaluation_store = None
+_evaluation_store_lock = threading.Lock()
+
+
+def get_evaluation_store():
+    """Almacén de evaluaciones del proceso, o None si no hay base de datos configurada"""
+    global _evaluation_store
+    path = os.environ.get('IMP_DATABASE') or EVALUATION_STORE['path']
+    if not path:
+        return None
+    with _evaluation_store_lock:
+        if _evaluation_store is None:
+            _evaluation_store = EvaluationStore(path, pool_size=EVALUATION_STORE['pool_size'])
+        return _evaluation_store
+
+
+def _optional_int(value):
+    return int(value) if value not in (None, '') else None
+
+
+@bp.route('/form')
+def evaluation_form():
+    """
+    Ruta que muestra el formulario de evaluación, generado a partir del catálogo de ítems.
+    Se sirve precomprimido y con ETag, respondiendo 304 a las peticiones condicionales.
+    """
+    try:
+        page = get_form_page()
+        body, encoding = page.encoded(request.accept_encodings)
+
+        response = Response(body, mimetype='text/html')
+        response.vary.add('Accept-Encoding')
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        response.set_etag(f"{page.etag}-{encoding}" if encoding else page.etag)
+        response.cache_control.no_cache = True
+        return response.make_conditional(request)
     except Exception as e:
-        logger.error(f"Error en la ruta del formulario: {str(e)}")
+        logger.error("Error en la ruta del formulario", error=str(e))
         return jsonify({'error': 'Error interno del servidor'}), 500
 
-@app.route('/')
+@bp.route('/')
 def index():
     """Ruta principal que muestra la página de inicio"""
     try:
         return render_template('index.html')
     except Exception as e:
-        logger.error(f"Error en la ruta principal: {str(e)}")
+        logger.error("Error en la ruta principal", error=str(e))
         return jsonify({'error': 'Error interno del servidor'}), 500
 
 
-@app.route('/evaluate', methods=['POST'])
+@bp.route('/evaluate', methods=['POST'])
 def evaluate():
     """
     Procesa el formulario de evaluación y retorna los resultados.
@@ -57,93 +164,182 @@ def evaluate():
     """
     try:
         data = request.form.to_dict()
-        logger.info(f"Recibida solicitud de evaluación para paciente ID: {data.get('patientId', 'Desconocido')}")
-
-        # Validamos los datos recibidos
-        validator = IMPValidator()
-        is_valid, error_message = validator.validate_form_data(data)
-        if not is_valid:
-            logger.warning(f"Validación fallida: {error_message}")
-            return jsonify({'error': error_message}), 400
-
-        # Calculamos las puntuaciones
-        scorer = IMPScorer()
-        scores = scorer.calculate_score(data)
-        interpretation = scorer.interpret_score(
-            scores['total'],
-            int(data['age_weeks'])
-        )
-        detailed_analysis = scorer.get_detailed_analysis(scores, int(data['age_weeks']))
+        logger.info("Recibida solicitud de evaluación", patient_id=data.get('patientId', 'Desconocido'))
+
+        # Validamos y convertimos los datos recibidos en una sola pasada
+        responses, errors = IMPValidator.parse_form_data(data)
+        if errors:
+            logger.warning("Validación fallida", errors=errors)
+            return jsonify({'error': '; '.join(errors), 'errors': errors}), 400
+
+        # Calculamos las puntuaciones una sola vez
+        result = evaluate_cached(VectorizedIMPScorer(), data, responses)
 
-        logger.info(f"Evaluación completada con éxito para paciente ID: {data.get('patientId', 'Desconocido')}")
+        # Guardamos la evaluación si hay almacén configurado; un fallo aquí no impide responder
+        evaluation_id = None
+        store = get_evaluation_store()
+        if store is not None:
+            try:
+                evaluation_id = store.save(result)
+            except Exception as e:
+                logger.error("Error guardando la evaluación", error=str(e))
+
+        logger.info("Evaluación completada", patient_id=data.get('patientId', 'Desconocido'),
+                    total=result.scores['total'])
 
         return jsonify({
             'status': 'success',
-            'scores': scores,
-            'interpretation': interpretation,
-            'detailed_analysis': detailed_analysis
+            'scores': result.scores,
+            'interpretation': result.interpretation,
+            'percentile': result.detailed_analysis['percentile'],
+            'age_band': result.detailed_analysis['age_band'],
+            'detailed_analysis': result.detailed_analysis,
+            'result_token': sign_result(result),
+            'evaluation_id': evaluation_id
         })
 
     except IMPError as e:
         return jsonify({'error': str(e)}), 400
     except Exception as e:
-        logger.error(f"Error durante la evaluación: {str(e)}")
+        logger.error("Error durante la evaluación", error=str(e))
         return jsonify({'error': 'Error interno del servidor'}), 500
 
 
-@app.route('/download_blank_form')
+def _load_batch_records():
+    """
+    Lee las evaluaciones de una petición por lotes, como array JSON o como NDJSON
+    (una evaluación por línea). Devuelve los registros y los errores de lectura por índice.
+    """
+    records = []
+    load_errors = {}
+
+    if request.mimetype == 'application/json':
+        payload = request.get_json(silent=True)
+        if isinstance(payload, dict):
+            payload = payload.get('evaluations')
+        if not isinstance(payload, list):
+            raise IMPError("Se esperaba un array JSON de evaluaciones")
+        entries = ((index, entry) for index, entry in enumerate(payload))
+    else:
+        def iter_ndjson():
+            index = 0
+            for line in request.stream:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield index, json.loads(line)
+                except ValueError:
+                    yield index, None
+                index += 1
+        entries = iter_ndjson()
+
+    for index, entry in entries:
+        if index >= MAX_BATCH_SIZE:
+            raise IMPError(f"El lote supera el máximo de {MAX_BATCH_SIZE} evaluaciones")
+        if not isinstance(entry, dict):
+            load_errors[index] = ["Registro no válido: se esperaba un objeto JSON"]
+            entry = {}
+        records.append(entry)
+
+    return records, load_errors
+
+
+@bp.route('/evaluate/batch', methods=['POST'])
+def evaluate_batch():
+    """
+    Valida y puntúa un lote de evaluaciones (array JSON o NDJSON) en una sola petición.
+    Devuelve los resultados y los errores de validación de cada registro.
+    """
+    try:
+        records, load_errors = _load_batch_records()
+        logger.info("Recibido lote de evaluaciones", count=len(records))
+
+        scorer = VectorizedIMPScorer()
+        batch_scores, batch_errors, _ = scorer.calculate_scores_batch(records)
+
+        results = []
+        for index, (data, scores, errors) in enumerate(zip(records, batch_scores, batch_errors)):
+            errors = load_errors.get(index, errors)
+            entry = {'index': index, 'patientId': data.get('patientId')}
+            if errors:
+                entry.update({'status': 'error', 'errors': errors})
+            else:
+                age_weeks = str(data.get('age_weeks', ''))
+                entry.update({
+                    'status': 'success',
+                    'scores': scores,
+                    'interpretation': scorer.interpret_score(
+                        scores['total'],
+                        int(age_weeks) if age_weeks.isdigit() else None
+                    )
+                })
+            results.append(entry)
+
+        valid_count = sum(1 for entry in results if entry['status'] == 'success')
+        logger.info("Lote completado", valid=valid_count, invalid=len(results) - valid_count)
+
+        return jsonify({
+            'status': 'success',
+            'count': len(results),
+            'valid': valid_count,
+            'invalid': len(results) - valid_count,
+            'results': results
+        })
+
+    except IMPError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error("Error durante la evaluación por lotes", error=str(e))
+        return jsonify({'error': 'Error interno del servidor'}), 500
+
+
+@reports_bp.route('/download_blank_form')
 def download_blank_form():
     """
-    Genera y devuelve un formulario IMP en blanco en formato PDF.
+    Devuelve el formulario IMP en blanco en formato PDF.
+    El PDF se renderiza una sola vez y se sirve con ETag/Last-Modified,
+    respondiendo 304 a las peticiones condicionales.
     """
     try:
-        logger.info("Generando formulario IMP en blanco")
-        pdf_generator = IMPReportGenerator()
-        pdf_bytes = pdf_generator.generate_blank_form()
+        from pdf_generator import get_blank_form
+        blank_form = get_blank_form()
 
+        # BytesIO comparte los bytes guardados mientras no se escriba en él: no hay copia
         return send_file(
-            io.BytesIO(pdf_bytes),
+            io.BytesIO(blank_form.pdf_bytes),
             mimetype='application/pdf',
             as_attachment=True,
-            download_name=f'IMP_formulario_{datetime.now().strftime("%Y%m%d")}.pdf'
+            download_name=f'IMP_formulario_{datetime.now().strftime("%Y%m%d")}.pdf',
+            etag=blank_form.etag,
+            last_modified=blank_form.last_modified,
+            conditional=True,
+            max_age=3600
         )
     except Exception as e:
-        logger.error(f"Error generando formulario en blanco: {str(e)}")
+        logger.error("Error generando formulario en blanco", error=str(e))
         return jsonify({'error': 'Error generando el formulario'}), 500
 
 
-@app.route('/download_results', methods=['POST'])
+@reports_bp.route('/download_results', methods=['POST'])
 def download_results():
     """
     Genera y devuelve un informe PDF con los resultados de la evaluación.
+    Se renderiza el resultado firmado que devolvió /evaluate (campo result_token);
+    si no se envía token o no es válido se valida y puntúa el formulario recibido.
     """
     try:
-        data = request.form.to_dict()
-        logger.info(f"Generando informe de resultados para paciente ID: {data.get('patientId', 'Desconocido')}")
-
-        # Validamos los datos nuevamente
-        validator = IMPValidator()
-        is_valid, error_message = validator.validate_form_data(data)
-        if not is_valid:
-            raise IMPError(error_message)
-
-        # Calculamos resultados
-        scorer = IMPScorer()
-        scores = scorer.calculate_score(data)
-        interpretation = scorer.interpret_score(
-            scores['total'],
-            int(data['age_weeks'])
-        )
-        detailed_analysis = scorer.get_detailed_analysis(scores, int(data['age_weeks']))
+        result = result_from_request()
+        data = result.data
+        logger.info("Generando informe de resultados", patient_id=data.get('patientId', 'Desconocido'))
 
-        # Generamos PDF
-        pdf_generator = IMPReportGenerator()
-        pdf_bytes = pdf_generator.generate_results_report(
-            data, scores, interpretation, detailed_analysis
-        )
+        # Generamos PDF a partir del resultado ya calculado (o reutilizamos el de un envío idéntico);
+        # se envía por bloques desde memoria o, si es grande, desde un fichero temporal
+        from pdf_generator import IMPReportGenerator
+        pdf_file = open_result_report(IMPReportGenerator(), result)
 
         return send_file(
-            io.BytesIO(pdf_bytes),
+            pdf_file,
             mimetype='application/pdf',
             as_attachment=True,
             download_name=f'IMP_resultados_{data.get("patientId", "desconocido")}_{datetime.now().strftime("%Y%m%d")}.pdf'
@@ -152,23 +348,477 @@ def download_results():
     except IMPError as e:
         return jsonify({'error': str(e)}), 400
     except Exception as e:
-        logger.error(f"Error generando informe de resultados: {str(e)}")
+        logger.error("Error generando informe de resultados", error=str(e))
         return jsonify({'error': 'Error generando el informe de resultados'}), 500
 
 
-@app.errorhandler(404)
+@reports_bp.route('/download_results/bulk', methods=['POST'])
+def download_results_bulk():
+    """
+    Genera en paralelo los informes PDF de muchas evaluaciones y los devuelve en un ZIP
+    enviado en streaming. Acepta JSON con 'result_tokens' (resultados firmados por /evaluate)
+    o 'evaluations' (formularios sin puntuar); los registros no válidos se listan en errores.txt.
+    """
+    try:
+        payload = request.get_json(silent=True)
+        if isinstance(payload, list):
+            payload = {'evaluations': payload}
+        if not isinstance(payload, dict):
+            raise IMPError("Se esperaba un objeto JSON con 'result_tokens' o 'evaluations'")
+
+        tokens = payload.get('result_tokens') or []
+        evaluations = payload.get('evaluations') or []
+        if not isinstance(tokens, list) or not isinstance(evaluations, list):
+            raise IMPError("'result_tokens' y 'evaluations' deben ser arrays")
+        if len(tokens) + len(evaluations) > MAX_BATCH_SIZE:
+            raise IMPError(f"El lote supera el máximo de {MAX_BATCH_SIZE} evaluaciones")
+
+        results = []
+        errors = []
+        for index, token in enumerate(tokens):
+            try:
+                results.append(load_result(str(token)))
+            except IMPError as e:
+                errors.append(f"Token {index}: {str(e)}")
+
+        records = [entry if isinstance(entry, dict) else {} for entry in evaluations]
+        batch_results, batch_errors = VectorizedIMPScorer().evaluate_batch(records)
+        for index, (data, result, record_errors) in enumerate(zip(records, batch_results, batch_errors)):
+            if result is None:
+                errors.append(f"Registro {index} ({data.get('patientId', 'desconocido')}): "
+                              f"{'; '.join(record_errors)}")
+            else:
+                results.append(result)
+
+        if not results:
+            raise IMPError("No hay evaluaciones válidas para generar informes")
+
+        logger.info("Generando informes en ZIP", count=len(results), invalid=len(errors))
+
+        from bulk_reports import stream_zip
+
+        return Response(
+            stream_zip(results, workers=REPORT_JOBS['workers'], errors=errors,
+                       executor=get_report_queue().executor()),
+            mimetype='application/zip',
+            headers={
+                'Content-Disposition':
+                    f'attachment; filename=IMP_informes_{datetime.now().strftime("%Y%m%d")}.zip'
+            }
+        )
+
+    except IMPError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error("Error generando informes en bloque", error=str(e))
+        return jsonify({'error': 'Error generando los informes de resultados'}), 500
+
+
+def _trajectory_inputs():
+    """
+    Reúne las evaluaciones de la trayectoria: las enviadas en la petición (POST, array JSON o
+    NDJSON) o las guardadas del paciente indicado en `patientId` (GET).
+    Devuelve el ID del paciente, la matriz de respuestas, los datos básicos y los errores por índice;
+    de las guardadas se descartan las que no tienen edad o usan otra configuración de ítems.
+    """
+    if request.method == 'GET':
+        patient_id = request.args.get('patientId')
+        if not patient_id:
+            raise IMPError("El parámetro patientId es obligatorio")
+        store = get_evaluation_store()
+        if store is None:
+            raise IMPError("Almacenamiento de evaluaciones no configurado")
+        history = []
+        errors = {}
+        for index, stored in enumerate(store.patient_history(patient_id)):
+            # Las respuestas guardadas con otra configuración de ítems no son comparables
+            if stored['config_hash'] != ITEM_CATALOG.config_hash:
+                errors[index] = [f"La evaluación {stored['id']} se guardó con otra configuración de ítems"]
+            elif stored['age_weeks'] is None:
+                errors[index] = [f"La evaluación {stored['id']} no tiene edad en semanas"]
+            else:
+                history.append(stored)
+        if not history:
+            return patient_id, None, [], errors
+        responses = np.vstack([stored['responses'] for stored in history])
+        return patient_id, responses, history, errors
+
+    records, load_errors = _load_batch_records()
+    parsed = parse_matrix(records)
+    batch_errors = IMPValidator.validate_batch(records, parsed)
+
+    valid_rows = []
+    errors = {}
+    for index, (data, record_errors) in enumerate(zip(records, batch_errors)):
+        record_errors = load_errors.get(index, record_errors)
+        if not record_errors and not str(data.get('age_weeks', '')).isdigit():
+            record_errors = ["Edad en semanas no válida"]
+        if record_errors:
+            errors[index] = record_errors
+        else:
+            valid_rows.append(index)
+
+    patient_ids = {str(records[index].get('patientId')) for index in valid_rows}
+    if len(patient_ids) > 1:
+        raise IMPError("Todas las evaluaciones de la trayectoria deben ser del mismo paciente")
+
+    evaluations = [
+        {'age_weeks': int(records[index]['age_weeks']), 'evaluationDate': records[index].get('evaluationDate')}
+        for index in valid_rows
+    ]
+    responses = response_matrix([records[index] for index in valid_rows]) if valid_rows else None
+    return next(iter(patient_ids), None), responses, evaluations, errors
+
+
+@bp.route('/patients/trajectory', methods=['GET', 'POST'])
+def patient_trajectory():
+    """
+    Trayectoria de un paciente: puntuaciones total, por sección y por tipo frente a la edad
+    postmenstrual, con las bandas de percentiles de referencia. Con `format=pdf` devuelve
+    el informe con la curva en lugar del JSON.
+    """
+    try:
+        patient_id, responses, evaluations, errors = _trajectory_inputs()
+        errors = [{'index': index, 'errors': record_errors} for index, record_errors in errors.items()]
+        if responses is None:
+            return jsonify({'error': 'No hay evaluaciones válidas para la trayectoria',
+                            'errors': errors}), 400
+
+        trajectory = build_trajectory(responses, evaluations)
+        logger.info("Trayectoria calculada", patient_id=patient_id, count=len(evaluations))
+
+        if request.args.get('format') == 'pdf':
+            if current_app.config['SCORING_ONLY']:
+                return jsonify({'error': 'Informes PDF no disponibles en este despliegue'}), 404
+            from pdf_generator import IMPReportGenerator
+            pdf_file = io.BytesIO()
+            IMPReportGenerator().write_trajectory_report(pdf_file, patient_id, trajectory)
+            pdf_file.seek(0)
+            return send_file(
+                pdf_file,
+                mimetype='application/pdf',
+                as_attachment=True,
+                download_name=f'IMP_trayectoria_{patient_id}.pdf'
+            )
+
+        return jsonify({
+            'status': 'success',
+            'patientId': patient_id,
+            'count': len(evaluations),
+            'trajectory': trajectory,
+            'errors': errors
+        })
+
+    except IMPError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error("Error calculando la trayectoria", error=str(e))
+        return jsonify({'error': 'Error interno del servidor'}), 500
+
+
+@bp.route('/patients/<patient_id>/evaluations')
+def patient_evaluations(patient_id):
+    """Historial completo de evaluaciones guardadas de un paciente"""
+    store = get_evaluation_store()
+    if store is None:
+        return jsonify({'error': 'Almacenamiento de evaluaciones no configurado'}), 503
+    try:
+        history = store.patient_history(patient_id)
+        return jsonify({
+            'patientId': patient_id,
+            'count': len(history),
+            'evaluations': [store.to_json(stored) for stored in history]
+        })
+    except Exception as e:
+        logger.error("Error consultando historial del paciente", error=str(e))
+        return jsonify({'error': 'Error interno del servidor'}), 500
+
+
+@bp.route('/evaluations')
+def cohort_evaluations():
+    """
+    Evaluaciones guardadas filtradas por fecha (date_from, date_to), edad (min_age, max_age),
+    evaluador y límite de resultados.
+    """
+    store = get_evaluation_store()
+    if store is None:
+        return jsonify({'error': 'Almacenamiento de evaluaciones no configurado'}), 503
+    try:
+        evaluations = store.cohort(
+            date_from=request.args.get('date_from') or None,
+            date_to=request.args.get('date_to') or None,
+            min_age=_optional_int(request.args.get('min_age')),
+            max_age=_optional_int(request.args.get('max_age')),
+            evaluator=request.args.get('evaluator') or None,
+            limit=_optional_int(request.args.get('limit'))
+        )
+        return jsonify({
+            'count': len(evaluations),
+            'evaluations': [store.to_json(stored) for stored in evaluations]
+        })
+    except ValueError:
+        return jsonify({'error': 'Parámetros de consulta no válidos'}), 400
+    except Exception as e:
+        logger.error("Error consultando evaluaciones", error=str(e))
+        return jsonify({'error': 'Error interno del servidor'}), 500
+
+
+def _cohort_inputs():
+    """
+    Reúne las evaluaciones de la cohorte: las enviadas en la petición (POST, array JSON o NDJSON)
+    o las guardadas que cumplen los filtros de /evaluations (GET).
+    Devuelve la matriz de respuestas, las edades, los evaluadores y los errores por índice.
+    """
+    if request.method == 'GET':
+        store = get_evaluation_store()
+        if store is None:
+            raise IMPError("Almacenamiento de evaluaciones no configurado")
+        try:
+            stored = store.cohort(
+                date_from=request.args.get('date_from') or None,
+                date_to=request.args.get('date_to') or None,
+                min_age=_optional_int(request.args.get('min_age')),
+                max_age=_optional_int(request.args.get('max_age')),
+                evaluator=request.args.get('evaluator') or None,
+                limit=_optional_int(request.args.get('limit'))
+            )
+        except ValueError:
+            raise IMPError("Parámetros de consulta no válidos")
+        # Las respuestas guardadas con otra configuración de ítems no son comparables
+        stored = [entry for entry in stored if entry['config_hash'] == ITEM_CATALOG.config_hash]
+        if not stored:
+            return None, [], [], {}
+        return (np.vstack([entry['responses'] for entry in stored]),
+                [np.nan if entry['age_weeks'] is None else entry['age_weeks'] for entry in stored],
+                [entry['evaluator'] for entry in stored], {})
+
+    records, load_errors = _load_batch_records()
+    parsed = parse_matrix(records)
+    batch_errors = IMPValidator.validate_batch(records, parsed)
+
+    valid_rows = []
+    errors = {}
+    for index, record_errors in enumerate(batch_errors):
+        record_errors = load_errors.get(index, record_errors)
+        if record_errors:
+            errors[index] = record_errors
+        else:
+            valid_rows.append(index)
+    if not valid_rows:
+        return None, [], [], errors
+
+    ages = [records[index].get('age_weeks') for index in valid_rows]
+    ages = [int(age) if str(age).isdigit() else np.nan for age in ages]
+    return (response_matrix([records[index] for index in valid_rows]), ages,
+            [str(records[index].get('evaluator') or '') for index in valid_rows], errors)
+
+
+@bp.route('/cohort/summary', methods=['GET', 'POST'])
+def cohort_summary():
+    """
+    Distribuciones de puntuaciones por sección y por tipo de una cohorte, agrupadas por banda de
+    edad y por evaluador. `group_by` lista las agrupaciones separadas por comas (claves unidas con
+    ':', por ejemplo age_band,evaluator,age_band:evaluator) e `items=1` añade el resumen por ítem.
+    """
+    try:
+        from cohort import cohort_frame, parse_group_by, summarize_cohort
+
+        try:
+            group_by = parse_group_by(request.args.get('group_by', 'age_band,evaluator'))
+        except ValueError as e:
+            raise IMPError(str(e))
+
+        responses, ages, evaluators, errors = _cohort_inputs()
+        errors = [{'index': index, 'errors': record_errors} for index, record_errors in errors.items()]
+        if responses is None:
+            return jsonify({'error': 'No hay evaluaciones válidas para la cohorte', 'errors': errors}), 400
+
+        frame = cohort_frame(responses, ages, evaluators)
+        summary = summarize_cohort(frame, group_by, include_items=request.args.get('items') == '1')
+        logger.info("Resumen de cohorte calculado", count=summary['count'], invalid=len(errors))
+
+        return jsonify({'status': 'success', **summary, 'errors': errors})
+
+    except IMPError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error("Error calculando el resumen de cohorte", error=str(e))
+        return jsonify({'error': 'Error interno del servidor'}), 500
+
+
+@bp.route('/psychometrics', methods=['GET', 'POST'])
+def psychometrics_report():
+    """
+    Dificultad y correlaciones ítem-total de cada ítem y alfa de Cronbach por sección y por tipo,
+    calculados sobre las mismas evaluaciones que /cohort/summary.
+    """
+    try:
+        from psychometrics import item_analysis
+
+        responses, _, _, errors = _cohort_inputs()
+        errors = [{'index': index, 'errors': record_errors} for index, record_errors in errors.items()]
+        if responses is None:
+            return jsonify({'error': 'No hay evaluaciones válidas para el análisis', 'errors': errors}), 400
+
+        analysis = item_analysis(responses)
+        logger.info("Análisis psicométrico calculado", count=analysis['count'], invalid=len(errors))
+        return jsonify({'status': 'success', **analysis, 'errors': errors})
+
+    except IMPError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error("Error calculando el análisis psicométrico", error=str(e))
+        return jsonify({'error': 'Error interno del servidor'}), 500
+
+
+@reports_bp.route('/reports', methods=['POST'])
+def create_report_job():
+    """
+    Encola la generación asíncrona del informe PDF y devuelve el ID del trabajo al instante.
+    Acepta los mismos datos que /download_results.
+    """
+    try:
+        result = result_from_request()
+        job_id = get_report_queue().submit(result)
+        logger.info("Informe encolado", patient_id=result.data.get('patientId', 'Desconocido'))
+
+        return jsonify({
+            'status': 'pending',
+            'job_id': job_id,
+            'status_url': f'/reports/{job_id}',
+            'download_url': f'/reports/{job_id}/download'
+        }), 202
+
+    except IMPError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error("Error encolando informe de resultados", error=str(e))
+        return jsonify({'error': 'Error generando el informe de resultados'}), 500
+
+
+@reports_bp.route('/reports/<job_id>')
+def report_job_status(job_id):
+    """Devuelve el estado de un trabajo de informe"""
+    info = get_report_queue().status(job_id)
+    if info is None:
+        return jsonify({'error': 'Informe no encontrado o caducado'}), 404
+    if info['status'] == 'done':
+        info['download_url'] = f'/reports/{job_id}/download'
+    return jsonify(info)
+
+
+@reports_bp.route('/reports/<job_id>/download')
+def report_job_download(job_id):
+    """Descarga el PDF de un trabajo terminado"""
+    queue = get_report_queue()
+    path = queue.pdf_path(job_id)
+    if path is None:
+        info = queue.status(job_id)
+        if info is None or info['status'] in ('error', 'expired'):
+            return jsonify({'error': 'Informe no encontrado o caducado'}), 404
+        return jsonify({'status': info['status'], 'error': 'El informe todavía no está listo'}), 409
+
+    return send_file(
+        path,
+        mimetype='application/pdf',
+        as_attachment=True,
+        download_name=f'IMP_resultados_{job_id}.pdf'
+    )
+
+
+@bp.route('/cache/stats')
+def result_cache_stats():
+    """Aciertos, fallos y ocupación de las cachés de resultados e informes"""
+    return jsonify(cache_stats())
+
+
+@bp.route('/metrics')
+def metrics():
+    """Latencias por etapa, tamaños de PDF y aciertos de caché en formato Prometheus"""
+    if not METRICS_ENABLED:
+        return jsonify({'error': 'Métricas desactivadas (IMP_METRICS=1 para activarlas)'}), 404
+    return Response(render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+
+@bp.app_errorhandler(404)
 def not_found_error(error):
     """Maneja errores 404 - Página no encontrada"""
     return jsonify({'error': 'Página no encontrada'}), 404
 
 
-@app.errorhandler(500)
+@bp.app_errorhandler(500)
 def internal_error(error):
     """Maneja errores 500 - Error interno del servidor"""
-    logger.error(f"Error interno del servidor: {str(error)}")
+    logger.error("Error interno del servidor", error=str(error))
     return jsonify({'error': 'Error interno del servidor'}), 500
 
 
+def _start_request():
+    # Identificador de correlación: el del proxy si lo envía, o uno nuevo
+    g.request_id = bind_request_id(request.headers.get(REQUEST_ID_HEADER))
+    if METRICS_ENABLED:
+        g.start_time = time.perf_counter()
+
+
+def _finish_request(response):
+    response.headers[REQUEST_ID_HEADER] = g.get('request_id', '')
+    start = g.get('start_time')
+    if start is not None:
+        observe_request(request.endpoint, response.status_code, time.perf_counter() - start)
+    return response
+
+
+def _teardown_request(error=None):
+    clear_request_context()
+
+
+def create_app(test_config: Dict[str, Any] = None) -> Flask:
+    """
+    Factoría de la aplicación: configura el logging una sola vez y registra las rutas.
+    """
+    configure_logging()
+
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = os.environ.get('IMP_SECRET_KEY')
+    app.config['SCORING_ONLY'] = (os.environ.get('IMP_SCORING_ONLY', '').lower() in ('1', 'true', 'yes')
+                                  or SCORING_ONLY)
+    if test_config:
+        app.config.update(test_config)
+
+    # La clave firma los tokens de resultado y debe ser la misma en todos los workers y tras
+    # un reinicio; una clave aleatoria sólo se admite en pruebas o en desarrollo (FLASK_DEBUG=1)
+    if not app.config['SECRET_KEY']:
+        if not (app.testing or app.debug):
+            raise RuntimeError("IMP_SECRET_KEY no está definida (en desarrollo, use FLASK_DEBUG=1)")
+        app.config['SECRET_KEY'] = os.urandom(32).hex()
+
+    app.register_blueprint(bp)
+    if not app.config['SCORING_ONLY']:
+        app.register_blueprint(reports_bp)
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.teardown_request(_teardown_request)
+    return app
+
+
+def preload_caches(app: Flask) -> None:
+    """
+    Construye por adelantado lo que es igual para todas las peticiones: catálogo de ítems,
+    estilos y plantillas de ReportLab (con sus fuentes), formulario PDF en blanco y formulario HTML.
+    Con gunicorn --preload se ejecuta en el proceso maestro y los workers lo heredan al hacer fork.
+    En modo sólo puntuación no se carga nada de ReportLab.
+    """
+    if not app.config['SCORING_ONLY']:
+        from pdf_generator import get_blank_form
+        get_blank_form()
+    with app.app_context():
+        get_form_page()
+    logger.info("Cachés precargadas")
+
+
+app = create_app()
+
+
 if __name__ == '__main__':
     # Configuración para desarrollo
     app.config['JSON_SORT_KEYS'] = False  # Mantiene el orden de las claves en JSON
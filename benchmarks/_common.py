@@ -0,0 +1,59 @@
+# benchmarks/_common.py
+
+"""
+Utilidades compartidas por los scripts de benchmarks: evaluaciones sintéticas generadas a
+partir de las opciones de ALL_ITEMS y medición de latencias.
+"""
+
+import os
+import random
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import ALL_ITEMS  # noqa: E402
+
+
+def synthetic_evaluation(seed: int) -> dict:
+    rng = random.Random(seed)
+    data = {
+        'patientId': f'BENCH-{seed}',
+        'evaluationDate': '2024-01-01',
+        'evaluator': 'Benchmark',
+        'age_weeks': str(rng.randint(32, 64))
+    }
+    for item_name, item_info in ALL_ITEMS.items():
+        data[item_name] = str(rng.choice(item_info['options'])['value'])
+    return data
+
+
+def synthetic_batch(size: int, first_seed: int = 0) -> List[dict]:
+    return [synthetic_evaluation(first_seed + index) for index in range(size)]
+
+
+def percentile(sorted_samples: List[float], fraction: float) -> float:
+    """Percentil por rango más cercano de una lista ya ordenada"""
+    index = max(0, min(len(sorted_samples) - 1, int(round(fraction * len(sorted_samples))) - 1))
+    return sorted_samples[index]
+
+
+def measure(func: Callable[[], object], repeat: int, warmup: int = 0) -> Dict[str, float]:
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        'median_ms': round(statistics.median(samples), 3),
+        'mean_ms': round(statistics.fmean(samples), 3),
+        'p95_ms': round(percentile(samples, 0.95), 3),
+        'p99_ms': round(percentile(samples, 0.99), 3),
+        'min_ms': round(samples[0], 3),
+        'max_ms': round(samples[-1], 3)
+    }
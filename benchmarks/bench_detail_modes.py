@@ -0,0 +1,76 @@
+# benchmarks/bench_detail_modes.py
+
+"""
+Compara los dos modos de detalle de ítems de los PDF (REPORT_DETAIL_MODE): 'paragraphs',
+con dos párrafos y un espaciador por ítem, y 'compact', con una tabla por sección y textos
+precalculados. Para el formulario en blanco y el informe de resultados muestra la latencia
+total, el tiempo de doc.build (etapas pdf_build_* de la instrumentación), las páginas y el tamaño.
+
+Uso:
+    python benchmarks/bench_detail_modes.py [--repeat 20] [-o modos.json]
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import sys
+from typing import Dict, Any, List
+
+# Las etapas pdf_build_* sólo se miden con la instrumentación activa
+os.environ['IMP_METRICS'] = '1'
+
+from _common import measure, synthetic_evaluation  # noqa: E402
+from instrumentation import STAGE_SECONDS  # noqa: E402
+from pdf_generator import DETAIL_MODES, IMPReportGenerator  # noqa: E402
+from scoring import VectorizedIMPScorer  # noqa: E402
+
+_PAGE = re.compile(rb'/Type /Page\b(?!s)')
+
+
+def measure_document(name: str, build_stage: str, render, repeat: int) -> Dict[str, Any]:
+    pdf_bytes = render()
+    count_before, seconds_before = STAGE_SECONDS.totals(build_stage)
+    stats = measure(render, repeat)
+    count, seconds = STAGE_SECONDS.totals(build_stage)
+    builds = count - count_before
+    return {
+        'document': name,
+        'median_ms': stats['median_ms'],
+        'p95_ms': stats['p95_ms'],
+        'build_mean_ms': round((seconds - seconds_before) / builds * 1000, 3) if builds else None,
+        'pages': len(_PAGE.findall(pdf_bytes)),
+        'bytes': len(pdf_bytes)
+    }
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Comparación de los modos de detalle de los PDF")
+    parser.add_argument('--repeat', type=int, default=20, help="Repeticiones por documento y modo")
+    parser.add_argument('-o', '--output', help="Fichero JSON de resultados")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.CRITICAL)
+    result = VectorizedIMPScorer().evaluate(synthetic_evaluation(1))
+
+    results = {}
+    for mode in DETAIL_MODES:
+        generator = IMPReportGenerator(mode)
+        results[mode] = [
+            measure_document('blank_form', 'pdf_build_blank_form', generator.generate_blank_form, args.repeat),
+            measure_document('results', 'pdf_build_results', lambda: generator.render_result(result), args.repeat),
+        ]
+        for entry in results[mode]:
+            print(f"{mode:<11} {entry['document']:<11} total={entry['median_ms']:>8} ms  "
+                  f"build={entry['build_mean_ms']:>8} ms  páginas={entry['pages']:>3}  bytes={entry['bytes']}",
+                  file=sys.stderr)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            json.dump(results, handle, indent=2, ensure_ascii=False)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
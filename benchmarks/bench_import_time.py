@@ -0,0 +1,115 @@
+# benchmarks/bench_import_time.py
+
+"""
+Tiempo de arranque de la aplicación: importa `app` en procesos nuevos con `-X importtime`,
+en modo completo y en modo sólo puntuación (IMP_SCORING_ONLY=1), y muestra el tiempo
+acumulado de importación, el tiempo total del proceso y si se llegó a cargar ReportLab.
+Con --first-pdf mide además lo que cuesta la primera petición de PDF (la importación diferida).
+
+Uso:
+    python benchmarks/bench_import_time.py [--repeat 5] [--first-pdf] [-o import.json]
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, Any, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODES = {
+    'completo': {},
+    'solo_puntuacion': {'IMP_SCORING_ONLY': '1'},
+}
+
+# Se imprime en la última línea de stderr para no mezclarse con la salida de -X importtime
+_PROBE = """
+import sys
+import app
+{extra}
+print('REPORTLAB=%d' % any(name.split('.')[0] == 'reportlab' for name in sys.modules), file=sys.stderr)
+"""
+_FIRST_PDF = """
+import time
+start = time.perf_counter()
+app.app.test_client().get('/download_blank_form')
+print('FIRST_PDF_MS=%.1f' % ((time.perf_counter() - start) * 1000), file=sys.stderr)
+"""
+
+_IMPORT_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def _run(env_overrides: Dict[str, str], first_pdf: bool) -> Dict[str, Any]:
+    env = dict(os.environ, IMP_LOG_LEVEL='WARNING', **env_overrides)
+    env.setdefault('IMP_SECRET_KEY', 'benchmark')
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    code = _PROBE.format(extra=_FIRST_PDF if first_pdf else '')
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT, env=env,
+                               capture_output=True, text=True, check=True)
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    app_us = None
+    modules = 0
+    sample: Dict[str, Any] = {'wall_ms': wall_ms}
+    for line in completed.stderr.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if match:
+            modules += 1
+            if match.group(4) == 'app' and not match.group(3).strip(' '):
+                app_us = int(match.group(2))
+        elif line.startswith('REPORTLAB='):
+            sample['reportlab_loaded'] = line.endswith('1')
+        elif line.startswith('FIRST_PDF_MS='):
+            sample['first_pdf_ms'] = float(line.split('=', 1)[1])
+    sample['import_app_ms'] = app_us / 1000 if app_us is not None else None
+    sample['modules'] = modules
+    return sample
+
+
+def measure_mode(env_overrides: Dict[str, str], repeat: int, first_pdf: bool) -> Dict[str, Any]:
+    # La primera ejecución compila los .pyc y no cuenta
+    _run(env_overrides, False)
+    samples = [_run(env_overrides, first_pdf) for _ in range(repeat)]
+    summary = {
+        'import_app_ms': round(statistics.median(s['import_app_ms'] for s in samples), 1),
+        'wall_ms': round(statistics.median(s['wall_ms'] for s in samples), 1),
+        'modules': samples[-1]['modules'],
+        'reportlab_loaded': samples[-1]['reportlab_loaded'],
+    }
+    if first_pdf and 'first_pdf_ms' in samples[-1]:
+        summary['first_pdf_ms'] = round(statistics.median(s['first_pdf_ms'] for s in samples), 1)
+    return summary
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Tiempo de importación de la aplicación")
+    parser.add_argument('--repeat', type=int, default=5, help="Procesos por modo")
+    parser.add_argument('--first-pdf', action='store_true',
+                        help="Mide también la primera petición de PDF en modo completo")
+    parser.add_argument('-o', '--output', help="Fichero JSON de resultados")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for mode, env_overrides in MODES.items():
+        summary = measure_mode(env_overrides, args.repeat, args.first_pdf and mode == 'completo')
+        results[mode] = summary
+        print(f"{mode:<16} import app={summary['import_app_ms']:>7} ms  proceso={summary['wall_ms']:>7} ms  "
+              f"módulos={summary['modules']:>4}  reportlab={'sí' if summary['reportlab_loaded'] else 'no'}"
+              + (f"  primer PDF={summary['first_pdf_ms']} ms" if 'first_pdf_ms' in summary else ''),
+              file=sys.stderr)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            json.dump({'python': sys.version.split()[0], 'results': results}, handle, indent=2,
+                      ensure_ascii=False)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,81 @@
+# benchmarks/bench_report_setup.py
+
+"""
+Mide el coste por informe de preparar estilos y gráficos, y la latencia total del informe.
+Compara la construcción por petición (hoja de estilos de ejemplo, estilos de párrafo y tabla
+y decoraciones de los gráficos creados de nuevo en cada informe, como antes de report_styles)
+con los estilos y plantillas compartidos de report_styles.
+
+Uso:
+    python benchmarks/bench_report_setup.py [--repeat 200]
+"""
+
+import argparse
+import logging
+
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import TableStyle
+
+from _common import measure, synthetic_evaluation
+from config import TEST_SECTIONS
+from pdf_generator import IMPReportGenerator
+from report_styles import (
+    INFO_TABLE_STYLE, SECTION_TABLE_STYLE, _section_chart_decorations, _type_chart_decorations
+)
+from scoring import VectorizedIMPScorer
+from visualization import IMPVisualizer
+
+
+def per_request_styles() -> None:
+    """Los estilos que report_styles construye una vez, creados de nuevo como en cada informe"""
+    styles = getSampleStyleSheet()
+    ParagraphStyle('CustomTitle', parent=styles['Heading1'], fontSize=13, spaceAfter=10, alignment=1)
+    ParagraphStyle('CustomSubTitle', parent=styles['Heading2'], fontSize=12, spaceAfter=8)
+    ParagraphStyle('CustomNormal', parent=styles['Normal'], fontSize=10, spaceBefore=6, spaceAfter=6)
+    ParagraphStyle('Options', parent=styles['Normal'], fontSize=9, leftIndent=20, spaceBefore=2, spaceAfter=2)
+    TableStyle(INFO_TABLE_STYLE.getCommands())
+    TableStyle(SECTION_TABLE_STYLE.getCommands())
+    _type_chart_decorations()
+    _section_chart_decorations()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    result = VectorizedIMPScorer().evaluate(synthetic_evaluation(1))
+    section_data = {section_info['title']: result.scores[section_name]
+                    for section_name, section_info in TEST_SECTIONS.items()}
+
+    def charts(visualizer):
+        visualizer.create_type_scores_chart(result.scores['type_scores'])
+        visualizer.create_section_scores_chart(section_data)
+
+    def shared_setup():
+        # Trabajo previo al maquetado que se repite en cada informe
+        IMPReportGenerator()
+        charts(IMPVisualizer())
+
+    def per_request_setup():
+        # Mismo trabajo, pero sin reutilizar nada de report_styles
+        per_request_styles()
+        IMPReportGenerator()
+        charts(IMPVisualizer())
+
+    def full_report():
+        IMPReportGenerator().render_result(result)
+
+    keys = ('median_ms', 'p95_ms')
+    per_request_stats = measure(per_request_setup, args.repeat)
+    shared_stats = measure(shared_setup, args.repeat)
+    report_stats = measure(full_report, max(1, args.repeat // 10))
+    print(f"preparación por petición:    { {key: per_request_stats[key] for key in keys} }")
+    print(f"preparación compartida:      { {key: shared_stats[key] for key in keys} }")
+    print(f"ahorro por informe (mediana): {per_request_stats['median_ms'] - shared_stats['median_ms']:.3f} ms")
+    print(f"informe completo:            { {key: report_stats[key] for key in keys} }")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,220 @@
+# benchmarks/bench_suite.py
+
+"""
+Suite de benchmarks de validación, puntuación, interpretación, gráficos y PDF.
+Cada caso se mide con lotes de distinto tamaño de evaluaciones sintéticas y se guardan
+latencias (mediana, p95, p99) y rendimiento en evaluaciones por segundo en un fichero JSON.
+Con --baseline se compara contra una ejecución anterior y se termina con código 1 si alguna
+mediana empeora más del umbral indicado.
+
+Uso:
+    python benchmarks/bench_suite.py -o bench.json [--batch-sizes 1,10,100,1000]
+    python benchmarks/bench_suite.py -o bench.json --baseline bench_main.json --threshold 0.2
+"""
+
+import argparse
+import json
+import logging
+import platform
+import sys
+from datetime import datetime, timezone
+from typing import Callable, Dict, Any, List, NamedTuple
+
+import numpy as np
+import reportlab
+
+from _common import measure, synthetic_batch
+from config import ITEM_CATALOG, TEST_SECTIONS
+from pdf_generator import DETAIL_MODES, IMPReportGenerator
+from scoring import IMPScorer, IMPValidator, ParsedResponses, VectorizedIMPScorer
+from vector_scoring import parse_matrix
+from visualization import IMPVisualizer
+
+
+class Case(NamedTuple):
+    name: str
+    # Recibe el lote de evaluaciones y devuelve la función a medir
+    prepare: Callable[[List[dict]], Callable[[], object]]
+    # Los casos sin lote (gráficos y PDF) se miden sólo con una evaluación
+    batched: bool = True
+    # Fracción de las repeticiones para los casos más lentos
+    repeat_factor: float = 1.0
+
+
+def _validate(records):
+    return lambda: [IMPValidator.validate_form_data(data) for data in records]
+
+
+def _parse(records):
+    return lambda: [IMPValidator.parse_form_data(data) for data in records]
+
+
+def _validate_batch(records):
+    return lambda: IMPValidator.validate_batch(records, parse_matrix(records))
+
+
+def _score(scorer_class):
+    def prepare(records):
+        scorer = scorer_class()
+        parsed = [ParsedResponses.from_data(data) for data in records]
+        return lambda: [scorer.calculate_score(responses) for responses in parsed]
+    return prepare
+
+
+def _score_batch(records):
+    scorer = VectorizedIMPScorer()
+    return lambda: scorer.calculate_scores_batch(records)
+
+
+def _interpret(records):
+    scorer = IMPScorer()
+    pairs = [(scorer.evaluate(data).scores['total'], int(data['age_weeks'])) for data in records]
+    return lambda: [scorer.interpret_score(total, age_weeks) for total, age_weeks in pairs]
+
+
+def _type_chart(records):
+    scores = VectorizedIMPScorer().evaluate(records[0]).scores
+    visualizer = IMPVisualizer()
+    return lambda: visualizer.create_type_scores_chart(scores['type_scores'])
+
+
+def _section_chart(records):
+    scores = VectorizedIMPScorer().evaluate(records[0]).scores
+    section_data = {section_info['title']: scores[section_name]
+                    for section_name, section_info in TEST_SECTIONS.items()}
+    visualizer = IMPVisualizer()
+    return lambda: visualizer.create_section_scores_chart(section_data)
+
+
+def _blank_form(detail_mode):
+    def prepare(records):
+        return lambda: IMPReportGenerator(detail_mode).generate_blank_form()
+    return prepare
+
+
+def _results_report(detail_mode):
+    def prepare(records):
+        result = VectorizedIMPScorer().evaluate(records[0])
+        return lambda: IMPReportGenerator(detail_mode).generate_results_report(
+            result.data, result.scores, result.interpretation, result.detailed_analysis, result.responses
+        )
+    return prepare
+
+
+CASES = (
+    Case('validator.validate_form_data', _validate),
+    Case('validator.parse_form_data', _parse),
+    Case('validator.validate_batch', _validate_batch),
+    Case('scorer.calculate_score', _score(IMPScorer)),
+    Case('vectorized_scorer.calculate_score', _score(VectorizedIMPScorer)),
+    Case('vectorized_scorer.calculate_scores_batch', _score_batch),
+    Case('scorer.interpret_score', _interpret),
+    Case('visualizer.create_type_scores_chart', _type_chart, batched=False),
+    Case('visualizer.create_section_scores_chart', _section_chart, batched=False),
+    *(Case(f'report.generate_blank_form[{mode}]', _blank_form(mode), batched=False, repeat_factor=0.1)
+      for mode in DETAIL_MODES),
+    *(Case(f'report.generate_results_report[{mode}]', _results_report(mode), batched=False, repeat_factor=0.1)
+      for mode in DETAIL_MODES),
+)
+
+
+def run_case(case: Case, batch_size: int, repeat: int) -> Dict[str, Any]:
+    records = synthetic_batch(batch_size)
+    func = case.prepare(records)
+    repeat = max(3, int(repeat * case.repeat_factor))
+    stats = measure(func, repeat, warmup=1)
+    return {
+        'name': case.name,
+        'batch_size': batch_size,
+        'repeat': repeat,
+        **stats,
+        'throughput_per_s': round(batch_size / (stats['median_ms'] / 1000), 1) if stats['median_ms'] else None
+    }
+
+
+def run(batch_sizes: List[int], repeat: int, only: str = None) -> Dict[str, Any]:
+    results = []
+    for case in CASES:
+        if only and only not in case.name:
+            continue
+        for batch_size in (batch_sizes if case.batched else [1]):
+            # Los lotes grandes se repiten menos para que la suite dure lo mismo en cada tamaño
+            case_repeat = max(3, repeat // max(1, batch_size // 10)) if case.batched else repeat
+            result = run_case(case, batch_size, case_repeat)
+            print(f"{result['name']:<45} n={batch_size:<6} mediana={result['median_ms']:>10.3f} ms  "
+                  f"p95={result['p95_ms']:>10.3f} ms  {result['throughput_per_s']}/s", file=sys.stderr)
+            results.append(result)
+
+    return {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': np.__version__,
+            'reportlab': reportlab.Version,
+            'config_hash': ITEM_CATALOG.config_hash,
+            'batch_sizes': batch_sizes,
+            'repeat': repeat
+        },
+        'results': results
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Casos cuya mediana empeora más de `threshold` (fracción) respecto a la ejecución de referencia.
+    """
+    previous = {(entry['name'], entry['batch_size']): entry for entry in baseline['results']}
+    regressions = []
+    for entry in current['results']:
+        reference = previous.get((entry['name'], entry['batch_size']))
+        if reference is None or not reference['median_ms']:
+            continue
+        change = entry['median_ms'] / reference['median_ms'] - 1
+        entry['change_vs_baseline'] = round(change, 4)
+        if change > threshold:
+            regressions.append(f"{entry['name']} (n={entry['batch_size']}): "
+                               f"{reference['median_ms']} ms -> {entry['median_ms']} ms (+{change:.0%})")
+    return regressions
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks de puntuación, validación y PDF")
+    parser.add_argument('-o', '--output', help="Fichero JSON de resultados (por defecto, salida estándar)")
+    parser.add_argument('--batch-sizes', default='1,10,100,1000',
+                        help="Tamaños de lote separados por comas")
+    parser.add_argument('--repeat', type=int, default=100, help="Repeticiones por caso con lote 1")
+    parser.add_argument('--only', help="Ejecuta sólo los casos cuyo nombre contenga este texto")
+    parser.add_argument('--baseline', help="JSON de una ejecución anterior con el que comparar")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="Empeoramiento máximo de la mediana admitido frente a --baseline")
+    args = parser.parse_args(argv)
+
+    batch_sizes = [int(size) for size in args.batch_sizes.split(',') if size.strip()]
+    if not batch_sizes or min(batch_sizes) < 1:
+        parser.error("--batch-sizes debe contener enteros mayores que 0")
+
+    logging.disable(logging.CRITICAL)
+    report = run(batch_sizes, args.repeat, args.only)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as handle:
+            regressions = compare(report, json.load(handle), args.threshold)
+        report['meta']['baseline'] = args.baseline
+        report['regressions'] = regressions
+
+    payload = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            handle.write(payload + '\n')
+    else:
+        print(payload)
+
+    for regression in regressions:
+        print(f"REGRESIÓN: {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
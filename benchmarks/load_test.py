@@ -0,0 +1,127 @@
+# benchmarks/load_test.py
+
+"""
+Prueba de carga de /evaluate y /download_results contra un servidor en marcha.
+Lanza peticiones concurrentes con evaluaciones sintéticas durante un tiempo fijo y muestra
+peticiones por segundo y latencias (mediana, p95, p99) por endpoint.
+
+Uso:
+    gunicorn -c gunicorn.conf.py wsgi:app &
+    python benchmarks/load_test.py --url http://127.0.0.1:8000 --concurrency 16 --duration 30
+"""
+
+import argparse
+import http.client
+import json
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List
+from urllib.parse import urlencode, urlsplit
+
+from _common import percentile, synthetic_batch
+
+ENDPOINTS = ('evaluate', 'download_results')
+
+
+class _Worker:
+    """
+    Cliente HTTP con conexión persistente que repite peticiones hasta la hora límite.
+    """
+
+    def __init__(self, host: str, port: int, bodies: List[bytes], path: str):
+        self.connection = http.client.HTTPConnection(host, port, timeout=60)
+        self.bodies = bodies
+        self.path = path
+        self.latencies: List[float] = []
+        self.errors = 0
+
+    def run(self, deadline: float, offset: int) -> None:
+        headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+        index = offset
+        while time.perf_counter() < deadline:
+            body = self.bodies[index % len(self.bodies)]
+            index += 1
+            start = time.perf_counter()
+            try:
+                self.connection.request('POST', self.path, body=body, headers=headers)
+                response = self.connection.getresponse()
+                response.read()
+                if response.status != 200:
+                    self.errors += 1
+                    continue
+            except (OSError, http.client.HTTPException):
+                self.errors += 1
+                self.connection.close()
+                continue
+            self.latencies.append((time.perf_counter() - start) * 1000)
+        self.connection.close()
+
+
+def run_endpoint(url: str, endpoint: str, concurrency: int, duration: float,
+                 bodies: List[bytes]) -> Dict[str, Any]:
+    parts = urlsplit(url)
+    workers = [_Worker(parts.hostname, parts.port or 80, bodies, f"{parts.path.rstrip('/')}/{endpoint}")
+               for _ in range(concurrency)]
+
+    start = time.perf_counter()
+    deadline = start + duration
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for offset, worker in enumerate(workers):
+            executor.submit(worker.run, deadline, offset)
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for worker in workers for latency in worker.latencies)
+    errors = sum(worker.errors for worker in workers)
+    summary = {
+        'endpoint': f"/{endpoint}",
+        'concurrency': concurrency,
+        'duration_s': round(elapsed, 2),
+        'requests': len(latencies),
+        'errors': errors,
+        'requests_per_s': round(len(latencies) / elapsed, 1)
+    }
+    if latencies:
+        summary.update({
+            'median_ms': round(statistics.median(latencies), 2),
+            'p95_ms': round(percentile(latencies, 0.95), 2),
+            'p99_ms': round(percentile(latencies, 0.99), 2)
+        })
+    return summary
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Prueba de carga de /evaluate y /download_results")
+    parser.add_argument('--url', default='http://127.0.0.1:8000', help="URL base del servidor")
+    parser.add_argument('--concurrency', type=int, default=8, help="Clientes simultáneos")
+    parser.add_argument('--duration', type=float, default=20, help="Segundos por endpoint")
+    parser.add_argument('--endpoints', default=','.join(ENDPOINTS),
+                        help="Endpoints a probar, separados por comas")
+    parser.add_argument('--distinct', type=int, default=200,
+                        help="Evaluaciones sintéticas distintas que se reparten entre peticiones")
+    parser.add_argument('-o', '--output', help="Fichero JSON de resultados")
+    args = parser.parse_args(argv)
+
+    endpoints = [endpoint.strip().strip('/') for endpoint in args.endpoints.split(',') if endpoint.strip()]
+    unknown = set(endpoints) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"Endpoints no admitidos: {', '.join(sorted(unknown))}")
+
+    bodies = [urlencode(data).encode() for data in synthetic_batch(args.distinct)]
+    results = []
+    for endpoint in endpoints:
+        summary = run_endpoint(args.url, endpoint, args.concurrency, args.duration, bodies)
+        print(f"{summary['endpoint']:<20} {summary['requests_per_s']:>8} req/s  "
+              f"mediana={summary.get('median_ms')} ms  p95={summary.get('p95_ms')} ms  "
+              f"errores={summary['errors']}", file=sys.stderr)
+        results.append(summary)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            json.dump({'url': args.url, 'results': results}, handle, indent=2, ensure_ascii=False)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,187 @@
+# bulk_reports.py
+
+"""
+Generación masiva de informes PDF en un archivo ZIP.
+Los informes se renderizan en paralelo en un pool de procesos y se van añadiendo al ZIP
+a medida que terminan, de forma que nunca hay en memoria más de unos pocos PDF a la vez.
+
+Uso:
+    python bulk_reports.py evaluaciones.ndjson -o informes.zip --workers 4
+"""
+
+import argparse
+import os
+import re
+import sys
+import zipfile
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, Any, BinaryIO, Iterable, Iterator, List, Optional, Tuple
+
+from bulk_score import INPUT_FORMATS, infer_format, iter_chunks, iter_records
+from logging_setup import configure_logging, get_logger
+from scoring import EvaluationResult, VectorizedIMPScorer
+
+logger = get_logger('imp.bulk_reports')
+
+ERRORS_FILENAME = 'errores.txt'
+
+
+def report_filename(index: int, data: Dict[str, Any]) -> str:
+    """
+    Nombre del PDF dentro del ZIP; el índice evita colisiones entre pacientes repetidos.
+    """
+    patient_id = re.sub(r'[^A-Za-z0-9_-]+', '_', str(data.get('patientId') or 'desconocido'))
+    evaluation_date = re.sub(r'[^0-9]+', '', str(data.get('evaluationDate') or ''))
+    suffix = f"_{evaluation_date}" if evaluation_date else ''
+    return f"{index:05d}_IMP_resultados_{patient_id}{suffix}.pdf"
+
+
+def render_report(result_payload: Dict[str, Any]) -> bytes:
+    """
+    Renderiza un informe en un proceso del pool.
+    """
+    from pdf_generator import IMPReportGenerator
+
+    return IMPReportGenerator().render_result(EvaluationResult.from_dict(result_payload))
+
+
+def iter_rendered_reports(results: Iterable[EvaluationResult], workers: int = None,
+                          executor: Executor = None) -> Iterator[Tuple[str, bytes]]:
+    """
+    Renderiza los informes en paralelo y los devuelve en orden como (nombre, bytes).
+    Como mucho hay 2 × workers informes en vuelo. Con `executor` se usa ese pool (el del
+    proceso web, que no se cierra); si no, se crea uno para esta llamada, como en la CLI.
+    """
+    workers = workers or os.cpu_count() or 1
+
+    if executor is not None:
+        yield from _render_with(executor, results, workers)
+        return
+
+    if workers == 1:
+        for index, result in enumerate(results):
+            yield report_filename(index, result.data), render_report(result.to_dict())
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from _render_with(executor, results, workers)
+
+
+def _render_with(executor: Executor, results: Iterable[EvaluationResult],
+                 workers: int) -> Iterator[Tuple[str, bytes]]:
+    pending = deque()
+    try:
+        for index, result in enumerate(results):
+            pending.append((report_filename(index, result.data),
+                            executor.submit(render_report, result.to_dict())))
+            if len(pending) >= workers * 2:
+                name, future = pending.popleft()
+                yield name, future.result()
+        while pending:
+            name, future = pending.popleft()
+            yield name, future.result()
+    finally:
+        # Si el cliente corta la descarga, no se siguen renderizando informes que nadie leerá
+        for _, future in pending:
+            future.cancel()
+
+
+def write_zip(results: Iterable[EvaluationResult], fileobj: BinaryIO, workers: int = None,
+              errors: Optional[List[str]] = None) -> int:
+    """
+    Escribe los informes en un ZIP sobre `fileobj` (que no necesita admitir seek).
+    Si se indican errores de validación, se añaden como errores.txt. Devuelve el número de informes.
+    """
+    count = 0
+    with zipfile.ZipFile(fileobj, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, pdf_bytes in iter_rendered_reports(results, workers):
+            archive.writestr(name, pdf_bytes)
+            count += 1
+        if errors:
+            archive.writestr(ERRORS_FILENAME, '\n'.join(errors) + '\n')
+    return count
+
+
+class _ChunkSink:
+    """
+    Destino de escritura sin seek que acumula lo escrito hasta que se recoge.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_zip(results: Iterable[EvaluationResult], workers: int = None,
+               errors: Optional[List[str]] = None, executor: Executor = None) -> Iterator[bytes]:
+    """
+    Genera el ZIP por fragmentos para enviarlo como respuesta HTTP en streaming.
+    Cada fragmento se entrega en cuanto el informe correspondiente se ha comprimido.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, pdf_bytes in iter_rendered_reports(results, workers, executor):
+            archive.writestr(name, pdf_bytes)
+            yield sink.drain()
+        if errors:
+            archive.writestr(ERRORS_FILENAME, '\n'.join(errors) + '\n')
+    yield sink.drain()
+
+
+def score_records(records: Iterable[Dict[str, Any]], errors: List[str],
+                  chunk_size: int = 500) -> Iterator[EvaluationResult]:
+    """
+    Valida y puntúa las evaluaciones por bloques, acumulando en `errors` las no válidas.
+    """
+    scorer = VectorizedIMPScorer()
+    first_row = 0
+    for chunk in iter_chunks(records, chunk_size):
+        results, batch_errors = scorer.evaluate_batch(chunk)
+        for offset, (data, result, record_errors) in enumerate(zip(chunk, results, batch_errors)):
+            if result is None:
+                errors.append(f"Registro {first_row + offset} "
+                              f"({data.get('patientId', 'desconocido')}): {'; '.join(record_errors)}")
+            else:
+                yield result
+        first_row += len(chunk)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generación masiva de informes IMP en un ZIP")
+    parser.add_argument('input', help="Fichero de evaluaciones (CSV o NDJSON)")
+    parser.add_argument('-o', '--output', required=True, help="Archivo ZIP de salida")
+    parser.add_argument('--input-format', choices=INPUT_FORMATS,
+                        help="Formato de entrada (por defecto, según la extensión)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Procesos de renderizado (por defecto, todos los núcleos)")
+    args = parser.parse_args(argv)
+
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers debe ser mayor que 0")
+
+    configure_logging()
+
+    input_format = args.input_format or infer_format(args.input, INPUT_FORMATS, 'csv')
+    errors = []
+    with open(args.output, 'wb') as handle:
+        count = write_zip(score_records(iter_records(args.input, input_format), errors),
+                          handle, workers=args.workers, errors=errors)
+
+    logger.info("Informes completados", count=count, output=args.output, invalid=len(errors))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,266 @@
+# bulk_score.py
+
+"""
+Puntuación masiva de evaluaciones IMP desde línea de comandos.
+Lee un fichero CSV o NDJSON por bloques de tamaño fijo, los valida y puntúa en un
+pool de procesos y escribe los resultados de forma incremental en CSV, NDJSON o Parquet,
+de modo que la memoria utilizada no depende del tamaño del fichero de entrada.
+La salida Parquet necesita el paquete opcional pyarrow.
+
+Uso:
+    python bulk_score.py evaluaciones.csv -o resultados.ndjson --workers 4
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, Any, Iterable, Iterator, List
+
+from config import ITEM_CATALOG, TEST_SECTIONS
+from logging_setup import configure_logging, get_logger
+from scoring import VectorizedIMPScorer
+
+logger = get_logger('imp.bulk_score')
+
+INPUT_FORMATS = ('csv', 'ndjson')
+OUTPUT_FORMATS = ('csv', 'ndjson', 'parquet')
+
+# Columnas de salida, idénticas para todos los formatos
+OUTPUT_COLUMNS = (
+    ['row', 'patientId', 'evaluationDate', 'evaluator', 'age_weeks', 'status', 'errors']
+    + list(TEST_SECTIONS.keys())
+    + [f"type_{item_type}_{field}" for item_type in ITEM_CATALOG.types
+       for field in ('total', 'max', 'percentage')]
+    + ['observed', 'provoked', 'total', 'interpretation']
+)
+
+
+def iter_records(path: str, input_format: str) -> Iterator[Dict[str, Any]]:
+    """
+    Recorre el fichero de entrada evaluación a evaluación sin cargarlo entero en memoria.
+    Las líneas NDJSON que no son un objeto JSON se devuelven como registro vacío.
+    """
+    with open(path, newline='', encoding='utf-8') as handle:
+        if input_format == 'csv':
+            yield from csv.DictReader(handle)
+            return
+
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            yield record if isinstance(record, dict) else {}
+
+
+def iter_chunks(records: Iterable[Dict[str, Any]], chunk_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Agrupa los registros en bloques de como máximo `chunk_size` evaluaciones.
+    """
+    iterator = iter(records)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def score_chunk(chunk: List[Dict[str, Any]], first_row: int) -> List[Dict[str, Any]]:
+    """
+    Valida, puntúa e interpreta un bloque de evaluaciones (con la misma interpretación por edad
+    que los endpoints) y lo traduce a filas planas de salida.
+    Se ejecuta en los procesos del pool, por lo que debe ser una función de módulo.
+    """
+    scorer = VectorizedIMPScorer()
+    results, batch_errors = scorer.evaluate_batch(chunk)
+
+    rows = []
+    for offset, (data, result, errors) in enumerate(zip(chunk, results, batch_errors)):
+        row = dict.fromkeys(OUTPUT_COLUMNS)
+        row.update({
+            'row': first_row + offset,
+            'patientId': data.get('patientId'),
+            'evaluationDate': data.get('evaluationDate'),
+            'evaluator': data.get('evaluator'),
+            'age_weeks': data.get('age_weeks'),
+        })
+
+        if errors:
+            row.update({'status': 'error', 'errors': '; '.join(errors)})
+            rows.append(row)
+            continue
+
+        scores = result.scores
+        row['status'] = 'success'
+        for section in TEST_SECTIONS.keys():
+            row[section] = scores[section]
+        for item_type, type_score in scores['type_scores'].items():
+            for field in ('total', 'max', 'percentage'):
+                row[f"type_{item_type}_{field}"] = type_score[field]
+        row.update({
+            'observed': scores['observed'],
+            'provoked': scores['provoked'],
+            'total': scores['total'],
+            'interpretation': result.interpretation
+        })
+        rows.append(row)
+
+    return rows
+
+
+class _CsvWriter:
+    def __init__(self, path: str):
+        self.handle = open(path, 'w', newline='', encoding='utf-8')
+        self.writer = csv.DictWriter(self.handle, fieldnames=OUTPUT_COLUMNS)
+        self.writer.writeheader()
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        self.writer.writerows(rows)
+
+    def close(self) -> None:
+        self.handle.close()
+
+
+class _NdjsonWriter:
+    def __init__(self, path: str):
+        self.handle = open(path, 'w', encoding='utf-8')
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        self.handle.writelines(json.dumps(row, ensure_ascii=False) + '\n' for row in rows)
+
+    def close(self) -> None:
+        self.handle.close()
+
+
+class _ParquetWriter:
+    def __init__(self, path: str):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("La salida Parquet requiere el paquete 'pyarrow' (pip install pyarrow)")
+
+        self.pa = pa
+        int_columns = set(TEST_SECTIONS.keys()) | {'row', 'observed', 'provoked', 'total'}
+        int_columns |= {f"type_{item_type}_{field}" for item_type in ITEM_CATALOG.types
+                        for field in ('total', 'max')}
+        float_columns = {f"type_{item_type}_percentage" for item_type in ITEM_CATALOG.types}
+        self.schema = pa.schema([
+            (column, pa.int64() if column in int_columns
+             else pa.float64() if column in float_columns
+             else pa.string())
+            for column in OUTPUT_COLUMNS
+        ])
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        # Los campos de texto pueden llegar como números desde NDJSON
+        for row in rows:
+            for column in ('patientId', 'evaluationDate', 'evaluator', 'age_weeks'):
+                if row[column] is not None:
+                    row[column] = str(row[column])
+        self.writer.write_table(self.pa.Table.from_pylist(rows, schema=self.schema))
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+WRITERS = {
+    'csv': _CsvWriter,
+    'ndjson': _NdjsonWriter,
+    'parquet': _ParquetWriter
+}
+
+
+def infer_format(path: str, choices: Iterable[str], default: str) -> str:
+    extension = os.path.splitext(path)[1].lstrip('.').lower()
+    if extension == 'jsonl':
+        extension = 'ndjson'
+    return extension if extension in choices else default
+
+
+def run(input_path: str, output_path: str, input_format: str, output_format: str,
+        chunk_size: int = 1000, workers: int = None) -> Dict[str, int]:
+    """
+    Puntúa todas las evaluaciones de `input_path` y escribe los resultados en `output_path`.
+    Como mucho hay 2 × workers bloques en vuelo, así que la memoria se mantiene acotada.
+    """
+    workers = workers or os.cpu_count() or 1
+    records = iter_records(input_path, input_format)
+    chunks = iter_chunks(records, chunk_size)
+    writer = WRITERS[output_format](output_path)
+    summary = {'total': 0, 'valid': 0, 'invalid': 0}
+
+    def consume(rows: List[Dict[str, Any]]) -> None:
+        writer.write(rows)
+        summary['total'] += len(rows)
+        summary['valid'] += sum(1 for row in rows if row['status'] == 'success')
+        summary['invalid'] = summary['total'] - summary['valid']
+
+    try:
+        if workers == 1:
+            first_row = 0
+            for chunk in chunks:
+                consume(score_chunk(chunk, first_row))
+                first_row += len(chunk)
+            return summary
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            first_row = 0
+            for chunk in chunks:
+                pending.append(executor.submit(score_chunk, chunk, first_row))
+                first_row += len(chunk)
+                if len(pending) >= workers * 2:
+                    consume(pending.popleft().result())
+            while pending:
+                consume(pending.popleft().result())
+        return summary
+
+    finally:
+        writer.close()
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Puntuación masiva de evaluaciones IMP")
+    parser.add_argument('input', help="Fichero de evaluaciones (CSV o NDJSON)")
+    parser.add_argument('-o', '--output', required=True, help="Fichero de resultados")
+    parser.add_argument('--input-format', choices=INPUT_FORMATS,
+                        help="Formato de entrada (por defecto, según la extensión)")
+    parser.add_argument('--format', dest='output_format', choices=OUTPUT_FORMATS,
+                        help="Formato de salida (por defecto, según la extensión)")
+    parser.add_argument('--chunk-size', type=int, default=1000,
+                        help="Evaluaciones por bloque (por defecto 1000)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Procesos de puntuación (por defecto, todos los núcleos)")
+    args = parser.parse_args(argv)
+
+    if args.chunk_size < 1:
+        parser.error("--chunk-size debe ser mayor que 0")
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers debe ser mayor que 0")
+
+    configure_logging()
+
+    input_format = args.input_format or infer_format(args.input, INPUT_FORMATS, 'csv')
+    output_format = args.output_format or infer_format(args.output, OUTPUT_FORMATS, 'ndjson')
+
+    logger.info("Puntuando evaluaciones", input=args.input, input_format=input_format,
+                output=args.output, output_format=output_format)
+    summary = run(args.input, args.output, input_format, output_format,
+                  chunk_size=args.chunk_size, workers=args.workers)
+    logger.info("Puntuación completada", total=summary['total'], valid=summary['valid'],
+                invalid=summary['invalid'])
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
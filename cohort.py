@@ -0,0 +1,174 @@
+# cohort.py
+
+"""
+Análisis de cohortes: carga las respuestas por ítem y las puntuaciones de muchas evaluaciones
+en un DataFrame columnar y calcula las distribuciones de puntuaciones por sección y por tipo,
+agrupadas por banda de edad (AGE_RANGES) y por evaluador.
+Las puntuaciones se obtienen con un único producto matricial (score_matrix) y las
+distribuciones con groupby de pandas; no hay bucles por registro.
+"""
+
+import re
+from typing import Dict, Any, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import ITEM_CATALOG
+from instrumentation import timed
+from percentiles import PERCENTILE_ENGINE
+from vector_scoring import (
+    MISSING, OBSERVED_COLUMN, PROVOKED_COLUMN, SECTION_COLUMNS, TOTAL_COLUMN, TYPE_COLUMNS, score_matrix
+)
+
+GROUP_KEYS = ('age_band', 'evaluator')
+# Separador de las claves de una agrupación. '+' se admite también, pero en una query string
+# llega decodificado como espacio, así que se separa igualmente por espacios.
+GROUP_SEPARATOR = ':'
+_GROUP_SPLIT = re.compile(r'[:+\s]+')
+
+# Columnas de puntuación del DataFrame: totales por sección y por tipo (y su porcentaje)
+SECTION_SCORE_COLUMNS = tuple(f'section_{section}' for section in ITEM_CATALOG.sections)
+TYPE_SCORE_COLUMNS = tuple(f'type_{item_type}' for item_type in ITEM_CATALOG.types)
+TYPE_PERCENT_COLUMNS = tuple(f'type_{item_type}_pct' for item_type in ITEM_CATALOG.types)
+SUMMARY_COLUMNS = ('total', 'percentile', 'observed', 'provoked') + SECTION_SCORE_COLUMNS + TYPE_PERCENT_COLUMNS
+
+# Estadísticos que groupby calcula de forma vectorizada y cuantiles añadidos
+_AGGREGATIONS = ('count', 'mean', 'std', 'min', 'max')
+_QUANTILES = {0.25: 'p25', 0.5: 'p50', 0.75: 'p75'}
+
+
+def _age_bands(ages: np.ndarray) -> pd.Categorical:
+    """Banda de AGE_RANGES de cada edad (nulo si la edad no cae en ninguna banda)"""
+    index, valid = PERCENTILE_ENGINE.band_indices(ages)
+    return pd.Categorical.from_codes(np.where(valid, index, -1), categories=PERCENTILE_ENGINE.labels)
+
+
+def parse_group_by(value: str) -> List[Tuple[str, ...]]:
+    """
+    Agrupaciones separadas por comas, cada una con sus claves unidas por GROUP_SEPARATOR
+    (por ejemplo 'age_band,evaluator,age_band:evaluator'). ValueError si alguna no es válida.
+    """
+    group_by = []
+    for grouping in value.split(','):
+        keys = tuple(key for key in _GROUP_SPLIT.split(grouping) if key)
+        if not keys:
+            continue
+        unknown = set(keys) - set(GROUP_KEYS)
+        if unknown:
+            raise ValueError(f"Agrupación no válida: {', '.join(sorted(unknown))}; "
+                             f"se admite: {', '.join(GROUP_KEYS)}")
+        if len(set(keys)) != len(keys):
+            raise ValueError(f"Clave repetida en la agrupación {GROUP_SEPARATOR.join(keys)}")
+        group_by.append(keys)
+    if not group_by:
+        raise ValueError(f"Agrupación no válida; se admite: {', '.join(GROUP_KEYS)}")
+    return group_by
+
+
+@timed('cohort_frame')
+def cohort_frame(responses: np.ndarray, ages: Sequence[float], evaluators: Sequence[str]) -> pd.DataFrame:
+    """
+    DataFrame de la cohorte, una fila por evaluación: edad, banda, evaluador, respuestas por
+    ítem (nulas si no hay respuesta) y las mismas puntuaciones que IMPScorer.calculate_score.
+    """
+    responses = np.atleast_2d(responses)
+    ages = np.asarray(ages, dtype=float)
+    totals, maxima = score_matrix(responses)
+
+    columns: Dict[str, Any] = {
+        'age_weeks': ages,
+        'age_band': _age_bands(ages),
+        'evaluator': pd.Categorical([evaluator or '' for evaluator in evaluators]),
+    }
+    for section_column, column in zip(SECTION_SCORE_COLUMNS, SECTION_COLUMNS):
+        columns[section_column] = totals[:, column]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        percentages = np.where(maxima[:, TYPE_COLUMNS] > 0,
+                               np.round(totals[:, TYPE_COLUMNS] / maxima[:, TYPE_COLUMNS] * 100, 1), 0.0)
+    for position, (score_column, percent_column) in enumerate(zip(TYPE_SCORE_COLUMNS, TYPE_PERCENT_COLUMNS)):
+        columns[score_column] = totals[:, TYPE_COLUMNS[position]]
+        columns[percent_column] = percentages[:, position]
+    columns['observed'] = totals[:, OBSERVED_COLUMN]
+    columns['provoked'] = totals[:, PROVOKED_COLUMN]
+    columns['total'] = totals[:, TOTAL_COLUMN]
+    columns['percentile'] = PERCENTILE_ENGINE.percentiles(totals[:, TOTAL_COLUMN], ages)
+
+    frame = pd.DataFrame(columns)
+    items = pd.DataFrame(
+        np.where(responses == MISSING, np.nan, responses).astype(np.float32),
+        columns=list(ITEM_CATALOG.keys)
+    )
+    return pd.concat([frame, items], axis=1)
+
+
+def _describe(frame: pd.DataFrame, keys: List[str]) -> List[Dict[str, Any]]:
+    """
+    Estadísticos de SUMMARY_COLUMNS por grupo, calculados en una sola operación groupby.
+    """
+    grouped = frame.groupby(keys, observed=True, sort=True)[list(SUMMARY_COLUMNS)]
+    aggregated = grouped.agg(list(_AGGREGATIONS))
+    quantiles = grouped.quantile(list(_QUANTILES)).unstack(level=-1)
+    quantiles.columns = pd.MultiIndex.from_tuples(
+        [(column, _QUANTILES[quantile]) for column, quantile in quantiles.columns])
+    described = pd.concat([aggregated, quantiles], axis=1).round(2)
+    described = described.astype(object).where(described.notna(), None)
+
+    groups = []
+    for group_key, row in zip(described.index, described.to_dict('records')):
+        group_key = group_key if isinstance(group_key, tuple) else (group_key,)
+        statistics: Dict[str, Dict[str, Any]] = {}
+        for (column, statistic), value in row.items():
+            statistics.setdefault(column, {})[statistic] = value
+        groups.append({
+            **dict(zip(keys, group_key)),
+            'count': int(statistics['total']['count']),
+            'total': statistics['total'],
+            'percentile': statistics['percentile'],
+            'observed': statistics['observed'],
+            'provoked': statistics['provoked'],
+            'sections': {section: statistics[column]
+                         for section, column in zip(ITEM_CATALOG.sections, SECTION_SCORE_COLUMNS)},
+            'types': {item_type: statistics[column]
+                      for item_type, column in zip(ITEM_CATALOG.types, TYPE_PERCENT_COLUMNS)},
+        })
+    return groups
+
+
+def _item_summary(frame: pd.DataFrame, keys: List[str]) -> List[Dict[str, Any]]:
+    """
+    Proporción de respuesta y media de cada ítem por grupo.
+    """
+    grouped = frame.groupby(keys, observed=True, sort=True)[list(ITEM_CATALOG.keys)]
+    answered = grouped.count().div(grouped.size(), axis=0).round(3)
+    means = grouped.mean().round(2)
+    means = means.astype(object).where(means.notna(), None)
+
+    summary = []
+    for group_key, answered_row, mean_row in zip(answered.index, answered.to_dict('records'),
+                                                 means.to_dict('records')):
+        group_key = group_key if isinstance(group_key, tuple) else (group_key,)
+        summary.append({
+            **dict(zip(keys, group_key)),
+            'items': {item: {'answered': answered_row[item], 'mean': mean_row[item]}
+                      for item in ITEM_CATALOG.keys}
+        })
+    return summary
+
+
+@timed('cohort_summary')
+def summarize_cohort(frame: pd.DataFrame, group_by: Sequence[Sequence[str]] = (('age_band',), ('evaluator',)),
+                     include_items: bool = False) -> Dict[str, Any]:
+    """
+    Distribuciones (recuento, media, desviación, mínimo, p25, p50, p75, máximo) de la puntuación
+    total, el percentil, las secciones y el porcentaje por tipo para cada agrupación pedida.
+    Las evaluaciones fuera de las bandas de edad no aparecen en la agrupación por banda.
+    """
+    summary: Dict[str, Any] = {'count': len(frame), 'groupings': {}}
+    for keys in group_by:
+        keys = list(keys)
+        grouping = {'groups': _describe(frame, keys)}
+        if include_items:
+            grouping['items'] = _item_summary(frame, keys)
+        summary['groupings'][GROUP_SEPARATOR.join(keys)] = grouping
+    return summary
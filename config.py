@@ -5,7 +5,11 @@ Configuración completa para la evaluación IMP (Infant Motor Performance).
 Incluye todos los ítems de evaluación con sus valores y descripciones según la traducción oficial.
 """
 
-from typing import Dict, List, Any
+import hashlib
+import json
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, List, Any, FrozenSet, Mapping, Tuple
 
 # =========================================================
 # CONFIGURACIÓN DE ÍTEMS Y VALORES
@@ -1021,6 +1025,55 @@ VALIDATION_RANGES = {
     }
 }
 
+# Número máximo de evaluaciones aceptadas en una sola petición de puntuación por lotes
+MAX_BATCH_SIZE = 10000
+
+# Validez (en segundos) del token firmado que devuelve /evaluate para descargar el informe
+RESULT_TOKEN_MAX_AGE = 3600
+
+# Cola asíncrona de informes PDF: procesos de renderizado y caché en disco de los PDF terminados
+REPORT_JOBS = {
+    'workers': 2,
+    'cache_dir': None,  # None = subdirectorio 'imp_reports' del directorio temporal del sistema
+    'cache_ttl': 3600,  # segundos
+    'max_entries': 500
+}
+
+# Almacén persistente de evaluaciones (SQLite). Sin ruta, las evaluaciones no se guardan;
+# la variable de entorno IMP_DATABASE tiene prioridad sobre 'path'
+EVALUATION_STORE = {
+    'path': None,
+    'pool_size': 4
+}
+
+# Caché en memoria de resultados y de informes PDF para envíos repetidos del mismo formulario
+RESULT_CACHE = {
+    'max_entries': 1024,
+    'report_max_entries': 64,  # los PDF ocupan más; se guardan menos
+    'report_max_bytes': 512 * 1024,  # los informes mayores no se guardan y se sirven desde disco
+    'ttl': 600  # segundos
+}
+
+# Detalle de ítems en los PDF: 'compact' (una tabla por sección con textos precalculados)
+# o 'paragraphs' (dos párrafos por ítem, el diseño original; más lento y con más páginas)
+REPORT_DETAIL_MODE = 'compact'
+
+# Logging estructurado; IMP_LOG_LEVEL, IMP_LOG_JSON e IMP_LOG_SAMPLE_RATE tienen prioridad
+LOGGING = {
+    'level': 'INFO',
+    'json': False,
+    'sample_rate': 0.01  # fracción de los mensajes repetitivos (por ítem o sección) que se emiten
+}
+
+# Métricas por etapa expuestas en /metrics; la variable de entorno IMP_METRICS=1 también las activa
+METRICS = {
+    'enabled': False
+}
+
+# Despliegue sólo de puntuación: no registra las rutas de informes PDF ni importa ReportLab.
+# La variable de entorno IMP_SCORING_ONLY=1 también lo activa
+SCORING_ONLY = False
+
 # Secciones del test para organización y cálculo de subtotales
 TEST_SECTIONS = {
     'supine': {
@@ -1167,4 +1220,123 @@ PROVOKED_ITEMS = {
     'adaptabilidad_alcance_sedestacion',
     'adaptabilidad_mano_sedestacion',
     'adaptabilidad_expresion_facial'
-}
\ No newline at end of file
+}
+
+
+# =========================================================
+# CATÁLOGO COMPILADO DE ÍTEMS
+# =========================================================
+
+# Orden fijo de los tipos de habilidad (Rendimiento, Variedad, Adaptabilidad, Simetría, Fluidez)
+ITEM_TYPES: Tuple[str, ...] = ('P', 'V', 'A', 'S', 'F')
+
+
+@dataclass(frozen=True, eq=False)
+class ItemCatalog:
+    """
+    Vista inmutable de ALL_ITEMS precalculada una sola vez al importar el módulo.
+    Los arrays por ítem siguen el orden de `keys` (número de ítem ascendente).
+    """
+    keys: Tuple[str, ...]
+    positions: Mapping[str, int]
+    titles: Tuple[str, ...]
+    numbers: Tuple[int, ...]
+    valid_values: Tuple[FrozenSet[int], ...]
+    max_values: Tuple[int, ...]
+    option_texts: Tuple[Mapping[int, str], ...]
+    sections: Tuple[str, ...]
+    section_index: Tuple[int, ...]
+    types: Tuple[str, ...]
+    type_index: Tuple[int, ...]
+    observed: Tuple[bool, ...]
+    provoked: Tuple[bool, ...]
+    section_items: Mapping[str, Tuple[int, ...]]
+    section_max: Mapping[str, int]
+    type_max: Mapping[str, int]
+    total_max: int
+    config_hash: str
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+
+def _build_item_catalog() -> ItemCatalog:
+    """
+    Compila ALL_ITEMS, TEST_SECTIONS, OBSERVED_ITEMS y PROVOKED_ITEMS en un ItemCatalog.
+    Un ítem sólo pertenece a su sección si su número está dentro del rango de la misma;
+    en caso contrario su índice de sección es -1.
+    """
+    ordered = sorted(ALL_ITEMS.items(), key=lambda entry: entry[1]['number'])
+    sections = tuple(TEST_SECTIONS.keys())
+
+    keys = tuple(item_name for item_name, _ in ordered)
+    valid_values = []
+    max_values = []
+    option_texts = []
+    section_index = []
+    type_index = []
+
+    for item_name, item_info in ordered:
+        values = [opt['value'] for opt in item_info['options'] if 'value' in opt]
+        valid_values.append(frozenset(values))
+        max_values.append(max(values))
+        option_texts.append(MappingProxyType({
+            opt['value']: opt.get('text', '') for opt in item_info['options'] if 'value' in opt
+        }))
+
+        section_info = TEST_SECTIONS.get(item_info['section'])
+        if section_info and section_info['start'] <= item_info['number'] <= section_info['end']:
+            section_index.append(sections.index(item_info['section']))
+        else:
+            section_index.append(-1)
+        type_index.append(ITEM_TYPES.index(item_info['type']))
+
+    section_items = {
+        section: tuple(pos for pos, idx in enumerate(section_index) if idx == section_pos)
+        for section_pos, section in enumerate(sections)
+    }
+
+    return ItemCatalog(
+        keys=keys,
+        positions=MappingProxyType({item_name: pos for pos, item_name in enumerate(keys)}),
+        titles=tuple(item_info['title'] for _, item_info in ordered),
+        numbers=tuple(item_info['number'] for _, item_info in ordered),
+        valid_values=tuple(valid_values),
+        max_values=tuple(max_values),
+        option_texts=tuple(option_texts),
+        sections=sections,
+        section_index=tuple(section_index),
+        types=ITEM_TYPES,
+        type_index=tuple(type_index),
+        observed=tuple(item_name in OBSERVED_ITEMS for item_name in keys),
+        provoked=tuple(item_name in PROVOKED_ITEMS for item_name in keys),
+        section_items=MappingProxyType(section_items),
+        section_max=MappingProxyType({
+            section: sum(max_values[pos] for pos in positions)
+            for section, positions in section_items.items()
+        }),
+        type_max=MappingProxyType({
+            item_type: sum(max_values[pos] for pos, idx in enumerate(type_index) if idx == type_pos)
+            for type_pos, item_type in enumerate(ITEM_TYPES)
+        }),
+        total_max=sum(max_values),
+        config_hash=_config_hash()
+    )
+
+
+def _config_hash() -> str:
+    """
+    Huella SHA-256 de la configuración de ítems y secciones.
+    Sirve de clave para los recursos derivados que sólo dependen de ella (p. ej. el formulario en blanco).
+    """
+    payload = json.dumps({
+        'items': ALL_ITEMS,
+        'sections': TEST_SECTIONS,
+        'observed': sorted(OBSERVED_ITEMS),
+        'provoked': sorted(PROVOKED_ITEMS)
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+# Catálogo único compartido por validación, puntuación, PDF y visualización
+ITEM_CATALOG: ItemCatalog = _build_item_catalog()
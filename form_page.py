@@ -0,0 +1,94 @@
+# form_page.py
+
+"""
+Página del formulario de evaluación generada a partir de config.ITEM_CATALOG.
+El HTML se renderiza una sola vez por configuración de ítems y se guarda ya comprimido
+(gzip y, si está instalado el paquete opcional brotli, también br).
+"""
+
+import gzip
+import hashlib
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Any, List, NamedTuple, Optional, Tuple
+
+from flask import render_template
+
+from config import ITEM_CATALOG, TEST_SECTIONS, VALIDATION_RANGES
+from logging_setup import get_logger
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = get_logger('imp.form_page')
+
+SECTION_LETTERS = 'ABCDEF'
+
+
+class FormPage(NamedTuple):
+    """Formulario ya renderizado y precomprimido, con su ETag"""
+    html: bytes
+    gzip: bytes
+    brotli: Optional[bytes]
+    etag: str
+
+    def encoded(self, accept_encodings) -> Tuple[bytes, Optional[str]]:
+        """
+        Cuerpo y Content-Encoding que corresponden a la cabecera Accept-Encoding del cliente.
+        """
+        if self.brotli is not None and accept_encodings['br']:
+            return self.brotli, 'br'
+        if accept_encodings['gzip']:
+            return self.gzip, 'gzip'
+        return self.html, None
+
+
+def form_sections() -> List[Dict[str, Any]]:
+    """
+    Secciones del formulario con sus ítems y opciones, en el orden de ITEM_CATALOG.
+    """
+    sections = []
+    for letter, (section_name, section_info) in zip(SECTION_LETTERS, TEST_SECTIONS.items()):
+        sections.append({
+            'key': section_name,
+            'letter': letter,
+            'title': section_info['title'],
+            'items': [
+                {
+                    'key': ITEM_CATALOG.keys[pos],
+                    'number': ITEM_CATALOG.numbers[pos],
+                    'title': ITEM_CATALOG.titles[pos],
+                    'options': sorted(ITEM_CATALOG.option_texts[pos].items())
+                }
+                for pos in ITEM_CATALOG.section_items[section_name]
+            ]
+        })
+    return sections
+
+
+@lru_cache(maxsize=4)
+def _render_form_page(config_hash: str, year: int) -> FormPage:
+    logger.info("Renderizando formulario HTML", config_hash=config_hash[:12])
+    html = render_template(
+        'form.html',
+        sections=form_sections(),
+        age_range=VALIDATION_RANGES['age_weeks'],
+        current_year=year
+    ).encode('utf-8')
+    return FormPage(
+        html=html,
+        gzip=gzip.compress(html, compresslevel=9),
+        brotli=brotli.compress(html) if brotli is not None else None,
+        etag=hashlib.sha256(html).hexdigest()[:32]
+    )
+
+
+def get_form_page() -> FormPage:
+    """
+    Devuelve el formulario renderizado para la configuración de ítems actual.
+    El pie de página incluye el año, así que también forma parte de la clave de caché.
+    Debe llamarse dentro de un contexto de aplicación Flask.
+    """
+    return _render_form_page(ITEM_CATALOG.config_hash, datetime.now().year)
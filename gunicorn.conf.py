@@ -0,0 +1,53 @@
+# gunicorn.conf.py
+
+"""
+Configuración de gunicorn para producción:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Todos los valores se pueden ajustar con variables de entorno (IMP_BIND, IMP_WORKERS,
+IMP_THREADS, IMP_TIMEOUT, IMP_MAX_REQUESTS). IMP_SECRET_KEY es obligatoria: firma los
+tokens de resultado y tiene que ser la misma en todos los workers. La generación de PDF usa la CPU, así que
+por defecto hay un worker por núcleo y unos pocos hilos por worker para las peticiones cortas.
+"""
+
+import multiprocessing
+import os
+
+bind = os.environ.get('IMP_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('IMP_WORKERS', multiprocessing.cpu_count()))
+threads = int(os.environ.get('IMP_THREADS', 4))
+worker_class = 'gthread' if threads > 1 else 'sync'
+timeout = int(os.environ.get('IMP_TIMEOUT', 60))
+graceful_timeout = 30
+keepalive = 5
+
+# Reciclado periódico de workers para acotar la memoria de ReportLab
+max_requests = int(os.environ.get('IMP_MAX_REQUESTS', 2000))
+max_requests_jitter = max_requests // 10
+
+# Importa wsgi:app (y precarga las cachés) en el maestro antes de hacer fork
+preload_app = True
+
+accesslog = '-'
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    # Cada worker debe crear sus propios recursos con estado: pool de procesos de informes y
+    # conexiones SQLite. Se crean de forma diferida en el primer uso, así que basta con
+    # comprobar que el maestro no los ha abierto.
+    import app as imp_app
+
+    if imp_app._report_queue is not None or imp_app._evaluation_store is not None:
+        server.log.warning("Recursos con estado creados antes del fork; se recrearán en el worker")
+        imp_app._report_queue = None
+        imp_app._evaluation_store = None
+
+
+def worker_exit(server, worker):
+    # Cierra el pool de procesos de informes del worker y cancela los trabajos pendientes
+    import app as imp_app
+
+    if imp_app._report_queue is not None:
+        imp_app._report_queue.shutdown()
@@ -0,0 +1,211 @@
+# instrumentation.py
+
+"""
+Instrumentación ligera por etapas: histogramas de latencia y contadores en memoria,
+expuestos en formato de texto de Prometheus.
+Se activa con METRICS['enabled'] o con la variable de entorno IMP_METRICS=1, que se leen al
+importar el módulo. Desactivada, `timed` devuelve las funciones sin envolver y un contexto
+vacío, así que el coste es nulo. Cada proceso lleva sus propias métricas.
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from config import METRICS
+
+ENABLED = os.environ.get('IMP_METRICS', '').lower() in ('1', 'true', 'yes') or METRICS['enabled']
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (5e3, 1e4, 2.5e4, 5e4, 1e5, 2.5e5, 5e5, 1e6, 2.5e6)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + '}'
+
+
+class Histogram:
+    """
+    Histograma acumulativo con cubetas fijas, por combinación de etiquetas.
+    """
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                # Recuentos por cubeta (la última es +Inf), suma y número de observaciones
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def totals(self, *label_values: str) -> Tuple[int, float]:
+        """Número de observaciones y suma de una serie (0 y 0.0 si no existe)"""
+        with self._lock:
+            series = self._series.get(label_values)
+            return (series[2], series[1]) if series else (0, 0.0)
+
+    def collect(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            snapshot = [(labels, list(counts), total, count)
+                        for labels, (counts, total, count) in sorted(self._series.items())]
+        for labels, counts, total, count in snapshot:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                yield (f"{self.name}_bucket"
+                       f"{_format_labels(self.label_names + ('le',), labels + (le,))} {cumulative}")
+            yield f"{self.name}_sum{_format_labels(self.label_names, labels)} {total}"
+            yield f"{self.name}_count{_format_labels(self.label_names, labels)} {count}"
+
+
+class Counter:
+    """
+    Contador monótono por combinación de etiquetas.
+    """
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def collect(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            snapshot = sorted(self._values.items())
+        for labels, value in snapshot:
+            yield f"{self.name}{_format_labels(self.label_names, labels)} {value}"
+
+
+STAGE_SECONDS = Histogram('imp_stage_duration_seconds', 'Duración de cada etapa del procesamiento', ('stage',))
+STAGE_ERRORS = Counter('imp_stage_errors_total', 'Etapas terminadas con excepción', ('stage',))
+REQUEST_SECONDS = Histogram('imp_request_duration_seconds', 'Duración de las peticiones HTTP',
+                            ('endpoint', 'status'))
+PDF_BYTES = Histogram('imp_pdf_bytes', 'Tamaño de los PDF generados', ('kind',), buckets=SIZE_BUCKETS)
+
+_METRICS = [STAGE_SECONDS, STAGE_ERRORS, REQUEST_SECONDS, PDF_BYTES]
+
+# Funciones que devuelven métricas llevadas fuera de este módulo como
+# (nombre, tipo, ayuda, etiquetas, valor), con tipo 'counter' o 'gauge'
+Sample = Tuple[str, str, str, Dict[str, str], float]
+_collectors: List[Callable[[], Iterable[Sample]]] = []
+
+
+class _Timer:
+    """
+    Mide una etapa; sirve como gestor de contexto y como decorador.
+    """
+
+    __slots__ = ('stage', '_start')
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        STAGE_SECONDS.observe(time.perf_counter() - self._start, self.stage)
+        if exc_type is not None:
+            STAGE_ERRORS.inc(self.stage)
+        return False
+
+    def __call__(self, func: Callable) -> Callable:
+        stage = self.stage
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with _Timer(stage):
+                return func(*args, **kwargs)
+        return wrapper
+
+
+class _NoopTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        return False
+
+    def __call__(self, func: Callable) -> Callable:
+        return func
+
+
+_NOOP_TIMER = _NoopTimer()
+
+
+def timed(stage: str):
+    """
+    Mide la duración de una etapa, como `with timed('scoring'):` o como `@timed('scoring')`.
+    """
+    return _Timer(stage) if ENABLED else _NOOP_TIMER
+
+
+def observe_request(endpoint: str, status: int, seconds: float) -> None:
+    if ENABLED:
+        REQUEST_SECONDS.observe(seconds, endpoint or 'desconocido', str(status))
+
+
+def observe_pdf_size(kind: str, size: int) -> None:
+    if ENABLED:
+        PDF_BYTES.observe(size, kind)
+
+
+def register_collector(collector: Callable[[], Iterable[Sample]]) -> None:
+    """
+    Registra una función que aporta métricas propias de otro módulo (por ejemplo, aciertos de caché).
+    """
+    _collectors.append(collector)
+
+
+def render_prometheus() -> str:
+    """
+    Todas las métricas del proceso en el formato de texto de Prometheus.
+    """
+    lines = []
+    for metric in _METRICS:
+        lines.extend(metric.collect())
+
+    families: Dict[str, Tuple[str, str, List[Tuple[Dict[str, str], float]]]] = {}
+    for collector in _collectors:
+        for name, kind, help_text, labels, value in collector():
+            families.setdefault(name, (kind, help_text, []))[2].append((labels, value))
+    for name, (kind, help_text, samples) in families.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            lines.append(f"{name}{_format_labels(tuple(labels), tuple(labels.values()))} {value}")
+
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,97 @@
+# logging_setup.py
+
+"""
+Logging estructurado con structlog sobre el logging estándar.
+El nivel se fija al importar el módulo (LOGGING['level'] o IMP_LOG_LEVEL): las llamadas por
+debajo de ese nivel son métodos vacíos y no formatean nada. Los mensajes repetitivos
+(por ítem o por sección) se marcan con `sampled=True` y sólo se emite una fracción
+LOGGING['sample_rate'] de ellos. El identificador de petición se guarda en contextvars y se
+añade a todos los registros, también a los de los loggers estándar ('imp.*').
+"""
+
+import logging
+import os
+import random
+import sys
+import uuid
+
+import structlog
+
+from config import LOGGING
+
+LOG_LEVEL = logging.getLevelName(os.environ.get('IMP_LOG_LEVEL', LOGGING['level']).upper())
+SAMPLE_RATE = float(os.environ.get('IMP_LOG_SAMPLE_RATE', LOGGING['sample_rate']))
+JSON_OUTPUT = os.environ.get('IMP_LOG_JSON', '').lower() in ('1', 'true', 'yes') or LOGGING['json']
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+
+
+def _sample(logger, method_name, event_dict):
+    """Descarta los mensajes marcados con sampled=True salvo una fracción SAMPLE_RATE"""
+    if event_dict.pop('sampled', False) and random.random() >= SAMPLE_RATE:
+        raise structlog.DropEvent
+    return event_dict
+
+
+# Procesadores comunes a los mensajes de structlog y a los del logging estándar
+_SHARED_PROCESSORS = [
+    structlog.contextvars.merge_contextvars,
+    structlog.stdlib.add_logger_name,
+    structlog.stdlib.add_log_level,
+    structlog.processors.TimeStamper(fmt='iso', utc=True),
+]
+
+structlog.configure(
+    processors=[
+        _sample,
+        *_SHARED_PROCESSORS,
+        structlog.processors.format_exc_info,
+        structlog.stdlib.ProcessorFormatter.wrap_for_formatter,
+    ],
+    wrapper_class=structlog.make_filtering_bound_logger(LOG_LEVEL),
+    logger_factory=structlog.stdlib.LoggerFactory(),
+    cache_logger_on_first_use=True,
+)
+
+_configured = False
+
+
+def get_logger(name: str):
+    return structlog.get_logger(name)
+
+
+def configure_logging() -> None:
+    """
+    Instala el formateador estructurado (JSON o texto) en el logger raíz.
+    Se llama una sola vez, desde la factoría de la aplicación o desde las herramientas de línea de comandos.
+    """
+    global _configured
+    if _configured:
+        return
+
+    renderer = (structlog.processors.JSONRenderer(ensure_ascii=False) if JSON_OUTPUT
+                else structlog.dev.ConsoleRenderer(colors=False))
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(structlog.stdlib.ProcessorFormatter(
+        foreign_pre_chain=_SHARED_PROCESSORS,
+        processors=[structlog.stdlib.ProcessorFormatter.remove_processors_meta, renderer],
+    ))
+
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(LOG_LEVEL)
+    _configured = True
+
+
+def bind_request_id(request_id: str = None) -> str:
+    """
+    Asocia un identificador de correlación a la petición en curso y lo devuelve.
+    """
+    request_id = request_id or uuid.uuid4().hex
+    structlog.contextvars.clear_contextvars()
+    structlog.contextvars.bind_contextvars(request_id=request_id)
+    return request_id
+
+
+def clear_request_context() -> None:
+    structlog.contextvars.clear_contextvars()
@@ -0,0 +1,225 @@
+# norms.py
+
+"""
+Construcción de normas locales: calcula los puntos de corte p5–p95 de cada banda de edad de
+AGE_RANGES a partir de un corpus propio de evaluaciones.
+La puntuación total es un entero entre 0 y la puntuación máxima del catálogo, así que el
+resumen de cada banda es su histograma exacto de puntuaciones: ocupa lo mismo sea cual sea
+el tamaño del corpus, se fusiona sumando recuentos y da cuantiles exactos sin ordenar nada.
+Los bloques se puntúan en un pool de procesos y sus histogramas se fusionan en el proceso
+principal; también se pueden guardar y fusionar resúmenes de ejecuciones distintas.
+La tabla resultante tiene la forma de AGE_RANGES y puede pasarse a PercentileEngine.
+
+Uso:
+    python norms.py evaluaciones.ndjson -o normas.json --workers 4
+    python norms.py centro_a.csv --save-sketch a.json
+    python norms.py centro_b.csv --merge-sketch a.json -o normas.json
+"""
+
+import argparse
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Iterable, List, Sequence
+
+import numpy as np
+
+from bulk_score import INPUT_FORMATS, infer_format, iter_chunks, iter_records
+from config import ITEM_CATALOG
+from logging_setup import configure_logging, get_logger
+from percentiles import PERCENTILE_ENGINE, PERCENTILE_KEYS, PERCENTILE_LEVELS
+from scoring import IMPValidator
+from vector_scoring import TOTAL_COLUMN, parse_matrix, score_matrix
+
+logger = get_logger('imp.norms')
+
+
+class NormSketch:
+    """
+    Histograma de puntuaciones totales por banda de edad (bandas × puntuaciones posibles).
+    """
+
+    def __init__(self, counts: np.ndarray = None, invalid: int = 0, out_of_band: int = 0):
+        shape = (len(PERCENTILE_ENGINE.labels), ITEM_CATALOG.total_max + 1)
+        self.counts = np.zeros(shape, dtype=np.int64) if counts is None else counts
+        self.invalid = invalid
+        self.out_of_band = out_of_band
+
+    def add_chunk(self, records: Sequence[Dict[str, Any]]) -> 'NormSketch':
+        """
+        Valida y puntúa un bloque de evaluaciones y suma sus puntuaciones a la banda de su edad.
+        Las evaluaciones con errores o sin edad válida cuentan como no válidas.
+        """
+        parsed = parse_matrix(records)
+        errors = IMPValidator.validate_batch(records, parsed)
+        ages = np.array([int(age) if str(age).isdigit() else -1
+                         for age in (data.get('age_weeks') for data in records)], dtype=np.int64)
+        valid = np.array([not record_errors for record_errors in errors], dtype=bool) & (ages >= 0)
+
+        band, in_band = PERCENTILE_ENGINE.band_indices(ages)
+        in_band &= valid
+
+        totals, _ = score_matrix(parsed[in_band])
+        cells = band[in_band] * self.counts.shape[1] + totals[:, TOTAL_COLUMN]
+        self.counts += np.bincount(cells, minlength=self.counts.size).reshape(self.counts.shape)
+
+        self.invalid += int((~valid).sum())
+        self.out_of_band += int((valid & ~in_band).sum())
+        return self
+
+    def merge(self, other: 'NormSketch') -> 'NormSketch':
+        self.counts += other.counts
+        self.invalid += other.invalid
+        self.out_of_band += other.out_of_band
+        return self
+
+    def band_counts(self) -> Dict[str, int]:
+        return dict(zip(PERCENTILE_ENGINE.labels, self.counts.sum(axis=1).tolist()))
+
+    def quantiles(self, levels: Sequence[float] = PERCENTILE_LEVELS) -> np.ndarray:
+        """
+        Cuantiles exactos (bandas × niveles): la menor puntuación cuya frecuencia acumulada
+        alcanza el nivel. Las bandas sin evaluaciones quedan a -1.
+        """
+        cumulative = np.cumsum(self.counts, axis=1)
+        sizes = cumulative[:, -1]
+        targets = np.ceil(np.outer(sizes, np.asarray(levels, dtype=float) / 100)).clip(min=1)
+        result = np.array([np.searchsorted(row, band_targets) for row, band_targets in zip(cumulative, targets)])
+        return np.where(sizes[:, None] > 0, result, -1)
+
+    def to_age_ranges(self, min_count: int = 1) -> Dict[str, Dict[str, int]]:
+        """
+        Tabla con la forma de AGE_RANGES; se omiten las bandas con menos de `min_count` evaluaciones.
+        """
+        quantiles = self.quantiles()
+        sizes = self.counts.sum(axis=1)
+        return {
+            label: dict(zip(PERCENTILE_KEYS, (int(value) for value in quantiles[index])))
+            for index, label in enumerate(PERCENTILE_ENGINE.labels)
+            if sizes[index] >= max(min_count, 1)
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'config_hash': ITEM_CATALOG.config_hash,
+            'bands': list(PERCENTILE_ENGINE.labels),
+            'counts': self.counts.tolist(),
+            'invalid': self.invalid,
+            'out_of_band': self.out_of_band
+        }
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> 'NormSketch':
+        if payload.get('config_hash') != ITEM_CATALOG.config_hash:
+            raise ValueError("El resumen se construyó con otra configuración de ítems")
+        if tuple(payload.get('bands', ())) != PERCENTILE_ENGINE.labels:
+            raise ValueError("El resumen se construyó con otras bandas de edad")
+        sketch = cls(invalid=payload.get('invalid', 0), out_of_band=payload.get('out_of_band', 0))
+        counts = np.asarray(payload['counts'], dtype=np.int64)
+        if counts.shape != sketch.counts.shape:
+            raise ValueError("Dimensiones del resumen no válidas")
+        sketch.counts = counts
+        return sketch
+
+
+def sketch_chunk(chunk: List[Dict[str, Any]]) -> NormSketch:
+    """
+    Resumen de un bloque; se ejecuta en los procesos del pool, por lo que debe ser una función de módulo.
+    """
+    return NormSketch().add_chunk(chunk)
+
+
+def build_sketch(records: Iterable[Dict[str, Any]], chunk_size: int = 5000,
+                 workers: int = None) -> NormSketch:
+    """
+    Recorre las evaluaciones por bloques y fusiona los resúmenes de cada bloque.
+    Como mucho hay 2 × workers bloques en vuelo, así que la memoria se mantiene acotada.
+    """
+    workers = workers or os.cpu_count() or 1
+    sketch = NormSketch()
+    chunks = iter_chunks(records, chunk_size)
+
+    if workers == 1:
+        for chunk in chunks:
+            sketch.add_chunk(chunk)
+        return sketch
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(sketch_chunk, chunk))
+            if len(pending) >= workers * 2:
+                sketch.merge(pending.popleft().result())
+        while pending:
+            sketch.merge(pending.popleft().result())
+    return sketch
+
+
+def norms_report(sketch: NormSketch, min_count: int = 1) -> Dict[str, Any]:
+    return {
+        'config_hash': ITEM_CATALOG.config_hash,
+        'AGE_RANGES': sketch.to_age_ranges(min_count),
+        'counts': sketch.band_counts(),
+        'invalid': sketch.invalid,
+        'out_of_band': sketch.out_of_band
+    }
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Construcción de normas locales por banda de edad")
+    parser.add_argument('inputs', nargs='*', help="Ficheros de evaluaciones (CSV o NDJSON)")
+    parser.add_argument('-o', '--output', help="Fichero JSON con la tabla (por defecto, salida estándar)")
+    parser.add_argument('--input-format', choices=INPUT_FORMATS,
+                        help="Formato de entrada (por defecto, según la extensión)")
+    parser.add_argument('--chunk-size', type=int, default=5000,
+                        help="Evaluaciones por bloque (por defecto 5000)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Procesos de puntuación (por defecto, todos los núcleos)")
+    parser.add_argument('--min-count', type=int, default=1,
+                        help="Evaluaciones mínimas para incluir una banda en la tabla")
+    parser.add_argument('--save-sketch', help="Guarda el resumen fusionado para combinarlo más tarde")
+    parser.add_argument('--merge-sketch', action='append', default=[],
+                        help="Resumen guardado que se fusiona con el resultado (repetible)")
+    args = parser.parse_args(argv)
+
+    if not args.inputs and not args.merge_sketch:
+        parser.error("Indique al menos un fichero de evaluaciones o un resumen guardado")
+    if args.chunk_size < 1:
+        parser.error("--chunk-size debe ser mayor que 0")
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers debe ser mayor que 0")
+
+    configure_logging()
+
+    sketch = NormSketch()
+    for path in args.inputs:
+        input_format = args.input_format or infer_format(path, INPUT_FORMATS, 'csv')
+        logger.info("Procesando evaluaciones", input=path, input_format=input_format)
+        sketch.merge(build_sketch(iter_records(path, input_format), args.chunk_size, args.workers))
+    for path in args.merge_sketch:
+        with open(path, encoding='utf-8') as handle:
+            try:
+                sketch.merge(NormSketch.from_dict(json.load(handle)))
+            except ValueError as e:
+                parser.error(f"{path}: {e}")
+
+    if args.save_sketch:
+        with open(args.save_sketch, 'w', encoding='utf-8') as handle:
+            json.dump(sketch.to_dict(), handle)
+
+    report = norms_report(sketch, args.min_count)
+    logger.info("Normas completadas", in_band=sum(report['counts'].values()), invalid=report['invalid'],
+                out_of_band=report['out_of_band'])
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            handle.write(output + '\n')
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
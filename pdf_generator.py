@@ -1,51 +1,108 @@
 # pdf_generator.py
 
+import reportlab
 from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from typing import Dict, Any, List
+from reportlab.lib.utils import simpleSplit
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table
+from typing import BinaryIO, Callable, Dict, Any, List, Mapping, NamedTuple, Tuple
 import io
-from datetime import datetime
-from config import OBSERVED_ITEMS, PROVOKED_ITEMS, ALL_ITEMS, TEST_SECTIONS
+from datetime import datetime, timezone
+from functools import lru_cache
+from config import ADDITIONAL_OBSERVATIONS, ITEM_CATALOG, REPORT_DETAIL_MODE, TEST_SECTIONS
+from instrumentation import observe_pdf_size, register_collector, timed
+from scoring import EvaluationResult, ParsedResponses
 from visualization import IMPVisualizer
-import logging
-
-logger = logging.getLogger('imp.pdf_generator')
-COLORS = {
-    'background': colors.HexColor('#E3ECFC'),  # Azul claro pastel
-    'main': colors.HexColor('#4E73DF'),        # Azul principal vibrante
-    'fill': colors.HexColor('#AFC8F5'),        # Azul suave para relleno
-    'grid': colors.HexColor('#BFD3F2'),        # Azul grisáceo para la grilla
-    'text': colors.HexColor('#374151'),        # Gris oscuro para el texto
-    'highlight': colors.HexColor('#1E40AF')    # Azul profundo para detalles
-}
+from report_styles import (
+    BLANK_DETAIL_WIDTHS,
+    COLORS,
+    DETAIL_FONT,
+    DETAIL_FONT_SIZE,
+    DETAIL_PADDING,
+    DETAIL_TABLE_STYLE,
+    INFO_TABLE_STYLE,
+    NORMAL_STYLE,
+    OPTIONS_STYLE,
+    SAMPLE_STYLES,
+    RESULTS_DETAIL_WIDTHS,
+    SECTION_TABLE_STYLE,
+    SUBTITLE_STYLE,
+    TITLE_STYLE,
+    TYPE_LABELS
+)
+from logging_setup import get_logger
+
+logger = get_logger('imp.pdf_generator')
+
+# El visualizador no guarda estado entre gráficos, así que se comparte en todo el proceso
+_VISUALIZER = IMPVisualizer()
+
+DETAIL_MODES = ('compact', 'paragraphs')
+
+# Versión del diseño de los PDF. Entra en el ETag del formulario en blanco junto con la versión de
+# ReportLab: hay que incrementarla con cualquier cambio de maquetación que no altere el catálogo
+REPORT_LAYOUT_VERSION = 1
+
+
+class DetailTexts(NamedTuple):
+    """Textos de las tablas de detalle, ya partidos en líneas para el ancho de su columna"""
+    results_titles: Tuple[str, ...]
+    results_answers: Tuple[Mapping[int, str], ...]
+    blank_titles: Tuple[str, ...]
+    blank_options: Tuple[str, ...]
+
+
+def _wrap(text: str, width: float) -> str:
+    return '\n'.join(simpleSplit(text, DETAIL_FONT, DETAIL_FONT_SIZE, width - 2 * DETAIL_PADDING))
+
+
+@lru_cache(maxsize=1)
+def detail_texts() -> DetailTexts:
+    """
+    Precalcula una sola vez por proceso el título de cada ítem y el texto de cada opción
+    (con su valor) para las tablas compactas; los informes sólo eligen la opción respondida.
+    """
+    return DetailTexts(
+        results_titles=tuple(_wrap(title, RESULTS_DETAIL_WIDTHS[1]) for title in ITEM_CATALOG.titles),
+        results_answers=tuple(
+            {value: _wrap(f"{value} - {texts.get(value, '')}", RESULTS_DETAIL_WIDTHS[3])
+             for value in sorted(valid_values)}
+            for valid_values, texts in zip(ITEM_CATALOG.valid_values, ITEM_CATALOG.option_texts)
+        ),
+        blank_titles=tuple(_wrap(title, BLANK_DETAIL_WIDTHS[1]) for title in ITEM_CATALOG.titles),
+        blank_options=tuple(
+            '\n'.join(_wrap(f"[{value}] {text}", BLANK_DETAIL_WIDTHS[2]) for value, text in texts.items())
+            for texts in ITEM_CATALOG.option_texts
+        ),
+    )
 
 
 class IMPReportGenerator:
-    def __init__(self):
-        self.styles = getSampleStyleSheet()
-        self.title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=self.styles['Heading1'],
-            fontSize=13,
-            spaceAfter=10,
-            alignment=1
-        )
-        self.subtitle_style = ParagraphStyle(
-            'CustomSubTitle',
-            parent=self.styles['Heading2'],
-            fontSize=12,
-            spaceAfter=8
-        )
-        self.normal_style = ParagraphStyle(
-            'CustomNormal',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            spaceBefore=6,
-            spaceAfter=6
-        )
+    def __init__(self, detail_mode: str = None):
+        self.detail_mode = detail_mode or REPORT_DETAIL_MODE
+        if self.detail_mode not in DETAIL_MODES:
+            raise ValueError(f"Modo de detalle no válido: {self.detail_mode}")
+
+        # Estilos compartidos por el proceso, construidos una sola vez en report_styles
+        self.styles = SAMPLE_STYLES
+        self.title_style = TITLE_STYLE
+        self.subtitle_style = SUBTITLE_STYLE
+        self.normal_style = NORMAL_STYLE
+        self.options_style = OPTIONS_STYLE
+
+    @staticmethod
+    def _to_bytes(write: Callable[..., int], *args) -> bytes:
+        """Ejecuta un método write_* sobre un búfer en memoria y devuelve el PDF"""
+        buffer = io.BytesIO()
+        write(buffer, *args)
+        return buffer.getvalue()
+
+    @staticmethod
+    def _detail_table(rows: List[List[str]], widths: Tuple[float, ...]) -> Table:
+        table = Table(rows, colWidths=widths, repeatRows=1)
+        table.setStyle(DETAIL_TABLE_STYLE)
+        return table
 
     def _create_header(self, story: List, title: str) -> None:
         story.append(Paragraph(title, self.title_style))
@@ -64,52 +121,21 @@ class IMPReportGenerator:
             ]
 
         table = Table(basic_data, colWidths=[4 * inch, 4 * inch])
-        table.setStyle(TableStyle([
-            ('GRID', (0, 0), (-1, -1), 0.5, COLORS['grid']),  # Azul grisáceo en lugar de gris
-            ('PADDING', (0, 0), (-1, -1), 4),
-            ('BACKGROUND', (0, 0), (-1, 0), COLORS['fill']),  # Azul claro en lugar de lightgrey
-            ('TEXTCOLOR', (0, 0), (-1, -1), COLORS['text'])  # Texto en gris oscuro
-        ]))
+        table.setStyle(INFO_TABLE_STYLE)
         story.append(table)
         story.append(Spacer(1, 20))
 
-    def _calculate_type_scores(self, data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    def generate_blank_form(self) -> bytes:
+        return self._to_bytes(self.write_blank_form)
+
+    @timed('pdf_blank_form')
+    def write_blank_form(self, output: BinaryIO) -> int:
         """
-        Calcula las puntuaciones por tipo de habilidad (P, V, A, S, F)
+        Escribe el formulario en blanco en `output` y devuelve los bytes escritos.
         """
-        type_scores = {
-            'P': {'total': 0, 'max': 0, 'percentage': 0},
-            'V': {'total': 0, 'max': 0, 'percentage': 0},
-            'A': {'total': 0, 'max': 0, 'percentage': 0},
-            'S': {'total': 0, 'max': 0, 'percentage': 0},
-            'F': {'total': 0, 'max': 0, 'percentage': 0}
-        }
-
-        for item_name, item_info in ALL_ITEMS.items():
-            if item_name in data and data[item_name]:
-                item_type = item_info['type']
-                try:
-                    value = int(data[item_name])
-                    # Encontrar el valor máximo posible para este ítem
-                    max_value = max(opt['value'] for opt in item_info['options'] if 'value' in opt)
-
-                    type_scores[item_type]['total'] += value
-                    type_scores[item_type]['max'] += max_value
-                except (ValueError, TypeError):
-                    continue
-
-        # Calcular porcentajes
-        for type_key in type_scores:
-            if type_scores[type_key]['max'] > 0:
-                type_scores[type_key]['percentage'] = round(
-                    (type_scores[type_key]['total'] / type_scores[type_key]['max']) * 100, 1
-                )
-
-        return type_scores
-    def generate_blank_form(self) -> bytes:
-        buffer = io.BytesIO()
+        start = output.tell()
         doc = SimpleDocTemplate(
-            buffer,
+            output,
             pagesize=A4,
             rightMargin=72,
             leftMargin=72,
@@ -128,49 +154,42 @@ class IMPReportGenerator:
             canvas.drawString(A4[0] - 85, 30, f"Página {page_num}")
             canvas.restoreState()
         story = []
-
-        # Crear estilo para las opciones
-        options_style = ParagraphStyle(
-            'Options',
-            parent=self.styles['Normal'],
-            fontSize=9,
-            leftIndent=20,
-            spaceBefore=2,
-            spaceAfter=2
-        )
+        options_style = self.options_style
 
         # Encabezado
         self._create_header(story, "Formulario de Evaluación IMP")
         self._create_basic_info_section(story)
 
         # Organizamos los ítems por sección
+        texts = detail_texts() if self.detail_mode == 'compact' else None
         for section_name, section_info in TEST_SECTIONS.items():
             story.append(Spacer(1, 10))
             story.append(Paragraph(section_info['title'], self.subtitle_style))
             story.append(Spacer(1, 3))
 
-            # Filtrar y ordenar ítems de esta sección
-            section_items = []
-            for item_name, item_info in ALL_ITEMS.items():
-                if (item_info['section'] == section_name and
-                        (item_name in OBSERVED_ITEMS or item_name in PROVOKED_ITEMS)):
-                    section_items.append((item_name, item_info))
+            # Ítems de esta sección, ya ordenados por número en el catálogo
+            positions = [pos for pos in ITEM_CATALOG.section_items[section_name]
+                         if ITEM_CATALOG.observed[pos] or ITEM_CATALOG.provoked[pos]]
+
+            if texts is not None:
+                rows = [["Nº", "Ítem", "Opciones"]]
+                rows.extend([str(ITEM_CATALOG.numbers[pos]), texts.blank_titles[pos], texts.blank_options[pos]]
+                            for pos in positions)
+                story.append(self._detail_table(rows, BLANK_DETAIL_WIDTHS))
+                continue
 
-            # Ordenar por número
-            section_items.sort(key=lambda x: x[1]['number'])
+            for pos in positions:
 
-            # Añadir ítems ordenados
-            for item_name, item_info in section_items:
                 story.append(Paragraph(
-                    f"{item_info['number']}. {item_info['title']}: ",
+                    f"{ITEM_CATALOG.numbers[pos]}. {ITEM_CATALOG.titles[pos]}: ",
                     self.normal_style
                 ))
 
                 # Opciones del ítem
-                options_text = []
-                for opt in item_info['options']:
-                    if 'value' in opt and 'text' in opt:
-                        options_text.append(f"[{opt['value']}] {opt['text']}")
+                options_text = [
+                    f"[{value}] {text}"
+                    for value, text in ITEM_CATALOG.option_texts[pos].items()
+                ]
 
                 story.append(Paragraph(
                     "<br/>".join(options_text),
@@ -210,15 +229,109 @@ class IMPReportGenerator:
         story.append(Paragraph("_" * 50, self.normal_style))
 
 
-        doc.build(story)
-        return buffer.getvalue()
+        with timed('pdf_build_blank_form'):
+            doc.build(story)
+        size = output.tell() - start
+        observe_pdf_size('blank_form', size)
+        return size
+
+    def generate_trajectory_report(self, patient_id: str, trajectory: Dict[str, Any]) -> bytes:
+        return self._to_bytes(self.write_trajectory_report, patient_id, trajectory)
+
+    @timed('pdf_trajectory')
+    def write_trajectory_report(self, output: BinaryIO, patient_id: str, trajectory: Dict[str, Any]) -> int:
+        """
+        Informe de trayectoria: tabla de evaluaciones por edad y curva de la puntuación total
+        sobre las bandas de percentiles (ver trajectory.build_trajectory).
+        Se escribe en `output` y devuelve los bytes escritos.
+        """
+        start = output.tell()
+        try:
+            doc = SimpleDocTemplate(
+                output,
+                pagesize=A4,
+                rightMargin=72,
+                leftMargin=72,
+                topMargin=72,
+                bottomMargin=72
+            )
+
+            story = []
+            self._create_header(story, "Trayectoria del Rendimiento Motor IMP")
+            story.append(Paragraph(f"ID Paciente: {patient_id}", self.normal_style))
+            story.append(Spacer(1, 10))
+
+            table_data = [["Fecha", "Edad (semanas)", "Puntuación total", "Percentil"]]
+            for evaluation_date, age_weeks, total, percentile in zip(
+                trajectory['evaluationDate'], trajectory['age_weeks'],
+                trajectory['total'], trajectory['percentile']
+            ):
+                table_data.append([
+                    evaluation_date or '',
+                    str(age_weeks),
+                    str(total),
+                    'N/A' if percentile is None else str(percentile)
+                ])
+
+            table = Table(table_data, colWidths=[1.6 * inch, 1.6 * inch, 1.6 * inch, 1.6 * inch])
+            table.setStyle(INFO_TABLE_STYLE)
+            story.append(table)
+            story.append(Spacer(1, 20))
+
+            story.append(Paragraph("Curva de la Puntuación Total", self.subtitle_style))
+            story.append(_VISUALIZER.create_trajectory_chart(trajectory))
+
+            story.append(Spacer(1, 20))
+            story.append(Paragraph(
+                f"Fecha del informe: {datetime.now().strftime('%d/%m/%Y')}",
+                self.normal_style
+            ))
+
+            with timed('pdf_build_trajectory'):
+                doc.build(story)
+            size = output.tell() - start
+            observe_pdf_size('trajectory', size)
+            return size
+
+        except Exception as e:
+            logger.error("Error al generar el informe de trayectoria", error=str(e))
+            raise
+
+    def render_result(self, result: EvaluationResult) -> bytes:
+        """
+        Genera el informe PDF a partir de un resultado ya calculado, sin volver a puntuar.
+        """
+        return self._to_bytes(self.write_result, result)
+
+    def write_result(self, output: BinaryIO, result: EvaluationResult) -> int:
+        """
+        Como render_result, pero escribe el PDF en `output` y devuelve los bytes escritos.
+        """
+        return self.write_results_report(
+            output, result.data, result.scores, result.interpretation, result.detailed_analysis,
+            result.responses
+        )
 
     def generate_results_report(self, data: Dict[str, Any], scores: Dict[str, int],
-                                interpretation: str, detailed_analysis: Dict[str, Any]) -> bytes:
-        buffer = io.BytesIO()
+                                interpretation: str, detailed_analysis: Dict[str, Any],
+                                responses: ParsedResponses = None) -> bytes:
+        return self._to_bytes(self.write_results_report, data, scores, interpretation,
+                              detailed_analysis, responses)
+
+    @timed('pdf_results')
+    def write_results_report(self, output: BinaryIO, data: Dict[str, Any], scores: Dict[str, int],
+                             interpretation: str, detailed_analysis: Dict[str, Any],
+                             responses: ParsedResponses = None) -> int:
+        """
+        Escribe el informe de resultados en `output` (cualquier fichero binario con tell(), como
+        un io.BytesIO) y devuelve los bytes escritos.
+        """
+        if responses is None:
+            responses = ParsedResponses.from_data(data)
+        start = output.tell()
         try:
             doc = SimpleDocTemplate(
-                buffer,
+                output,
                 pagesize=A4,
                 rightMargin=72,
                 leftMargin=72,
@@ -246,20 +359,13 @@ class IMPReportGenerator:
             # Puntuaciones por tipo de habilidad
             story.append(Paragraph("Resultados por Tipo de Habilidad", self.subtitle_style))
 
-            type_scores = self._calculate_type_scores(data)
-            type_labels = {
-                'P': 'Rendimiento',
-                'V': 'Variedad',
-                'A': 'Adaptabilidad',
-                'S': 'Simetría',
-                'F': 'Fluidez'
-            }
+            type_scores = scores['type_scores']
 
             type_data = [["Habilidad", "Puntuación", "Porcentaje", "Puntuación máxima"]]
             total_score = 0
             total_max = 0
 
-            for type_key, label in type_labels.items():
+            for type_key, label in TYPE_LABELS.items():
                 score = type_scores[type_key]
                 total_score += score['total']
                 total_max += score['max']
@@ -280,20 +386,15 @@ class IMPReportGenerator:
             ])
 
             type_table = Table(type_data, colWidths=[2 * inch, 1.5 * inch, 1.5 * inch, 1.5 * inch])
-            type_table.setStyle(TableStyle([
-                ('GRID', (0, 0), (-1, -1), 0.5, COLORS['grid']),  # Azul grisáceo en lugar de gris
-                ('PADDING', (0, 0), (-1, -1), 4),
-                ('BACKGROUND', (0, 0), (-1, 0), COLORS['fill']),  # Azul claro en lugar de lightgrey
-                ('TEXTCOLOR', (0, 0), (-1, -1), COLORS['text'])  # Texto en gris oscuro
-            ]))
+            type_table.setStyle(INFO_TABLE_STYLE)
 
             story.append(type_table)
             story.append(Spacer(1, 20))
 
             # Añadir visualizaciones
             try:
-                logger.info("Iniciando generación de visualizaciones")
-                visualizer = IMPVisualizer()
+                logger.debug("Iniciando generación de visualizaciones")
+                visualizer = _VISUALIZER
 
                 # Gráfico de puntuaciones por tipo
                 story.append(Paragraph("Visualización de Puntuaciones por Tipo", self.subtitle_style))
@@ -308,9 +409,9 @@ class IMPReportGenerator:
                 section_chart = visualizer.create_section_scores_chart(section_data)
                 story.append(section_chart)
 
-                logger.info("Visualizaciones generadas exitosamente")
+                logger.debug("Visualizaciones generadas")
             except Exception as e:
-                logger.error(f"Error al generar visualizaciones: {str(e)}")
+                logger.error("Error al generar visualizaciones", error=str(e))
                 # Continuamos con el resto del informe aunque fallen los gráficos
 
             # Añadir espacio después de los gráficos
@@ -320,50 +421,49 @@ class IMPReportGenerator:
             story.append(Paragraph("Resultados por Sección", self.subtitle_style))
             section_data = [["Sección", "Puntuación Total"]]
             for section_name, section_info in TEST_SECTIONS.items():
-                section_score = sum(int(data.get(item_name, 0))
-                                    for item_name, item_info in ALL_ITEMS.items()
-                                    if item_info['section'] == section_name and item_name in data)
-                section_data.append([section_info['title'], str(section_score)])
+                section_data.append([section_info['title'], str(scores.get(section_name, 0))])
 
             section_table = Table(section_data, colWidths=[5 * inch, 1.5 * inch])
-            section_table.setStyle(TableStyle([
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-                ('PADDING', (0, 0), (-1, -1), 6),
-                ('ALIGN', (-1, 0), (-1, -1), 'CENTER'),
-            ]))
+            section_table.setStyle(SECTION_TABLE_STYLE)
             story.append(section_table)
             story.append(Spacer(1, 20))
 
             # Detalle de Respuestas por Sección
             story.append(Paragraph("Detalle de Respuestas", self.subtitle_style))
 
+            texts = detail_texts() if self.detail_mode == 'compact' else None
             for section_name, section_info in TEST_SECTIONS.items():
                 story.append(Spacer(1, 10))
                 story.append(Paragraph(section_info['title'], self.subtitle_style))
 
+                if texts is not None:
+                    rows = [["Nº", "Ítem", "Tipo", "Respuesta"]]
+                    for pos in ITEM_CATALOG.section_items[section_name]:
+                        selected_value = responses.value(pos)
+                        if selected_value is not None:
+                            rows.append([
+                                str(ITEM_CATALOG.numbers[pos]),
+                                texts.results_titles[pos],
+                                ITEM_CATALOG.types[ITEM_CATALOG.type_index[pos]],
+                                texts.results_answers[pos].get(selected_value, str(selected_value))
+                            ])
+                    if len(rows) > 1:
+                        story.append(self._detail_table(rows, RESULTS_DETAIL_WIDTHS))
+                    continue
+
                 section_items = []
-                for item_name, item_info in ALL_ITEMS.items():
-                    if (item_info['section'] == section_name and
-                            item_name in data and
-                            data[item_name]):
-
-                        selected_value = int(data[item_name])
-                        selected_text = ""
-                        for opt in item_info['options']:
-                            if opt['value'] == selected_value:
-                                selected_text = opt['text']
-                                break
+                for pos in ITEM_CATALOG.section_items[section_name]:
+                    selected_value = responses.value(pos)
+                    if selected_value is not None:
+                        selected_text = ITEM_CATALOG.option_texts[pos].get(selected_value, "")
 
                         section_items.append((
-                            item_info['number'],
-                            item_info['title'],
+                            ITEM_CATALOG.numbers[pos],
+                            ITEM_CATALOG.titles[pos],
                             f"{selected_value} - {selected_text}",
-                            item_info['type']
+                            ITEM_CATALOG.types[ITEM_CATALOG.type_index[pos]]
                         ))
 
-                section_items.sort(key=lambda x: x[0])
-
                 for num, title, response, item_type in section_items:
                     story.append(Paragraph(
                         f"{num}. {title} [{item_type}]:",
@@ -375,9 +475,8 @@ class IMPReportGenerator:
                     ))
                     story.append(Spacer(1, 5))
 
-            # Observaciones adicionales si existen
-            if any(key in data for key in
-                   ['estado_conductual', 'estado_salud', 'otras_observaciones', 'cantidad_movimientos']):
+            # Observaciones adicionales si alguna tiene contenido (la misma condición que report_key)
+            if any(data.get(key) for key in ADDITIONAL_OBSERVATIONS):
                 story.append(Spacer(1, 15))
                 story.append(Paragraph("Observaciones", self.subtitle_style))
 
@@ -403,15 +502,49 @@ class IMPReportGenerator:
             story.append(Paragraph("Firma del evaluador:", self.normal_style))
             story.append(Paragraph("_" * 30, self.normal_style))
 
-            doc.build(story, onFirstPage=add_header_footer, onLaterPages=add_header_footer)
-            return buffer.getvalue()
+            with timed('pdf_build_results'):
+                doc.build(story, onFirstPage=add_header_footer, onLaterPages=add_header_footer)
+            size = output.tell() - start
+            observe_pdf_size('results', size)
+            return size
 
         except Exception as e:
-            logger.error(f"Error al generar el informe PDF: {str(e)}")
+            logger.error("Error al generar el informe PDF", error=str(e))
             raise
 
-        finally:
-            buffer.close()
 
+class BlankFormPDF(NamedTuple):
+    """Formulario en blanco ya renderizado junto con sus metadatos de caché HTTP"""
+    pdf_bytes: bytes
+    etag: str
+    last_modified: datetime
+
+
+@lru_cache(maxsize=4)
+def _render_blank_form(config_hash: str, detail_mode: str) -> BlankFormPDF:
+    logger.info("Renderizando formulario en blanco", config_hash=config_hash[:12], detail_mode=detail_mode)
+    return BlankFormPDF(
+        pdf_bytes=IMPReportGenerator(detail_mode).generate_blank_form(),
+        etag=f"{config_hash}-{detail_mode}-v{REPORT_LAYOUT_VERSION}-rl{reportlab.Version}",
+        last_modified=datetime.now(timezone.utc).replace(microsecond=0)
+    )
+
+
+def get_blank_form() -> BlankFormPDF:
+    """
+    Devuelve el formulario en blanco, renderizado una única vez por configuración de ítems.
+    El contenido sólo depende de ALL_ITEMS, TEST_SECTIONS, del modo de detalle y del código que
+    lo maqueta, así que el ETag combina la huella del catálogo, el modo, REPORT_LAYOUT_VERSION
+    y la versión de ReportLab.
+    """
+    return _render_blank_form(ITEM_CATALOG.config_hash, REPORT_DETAIL_MODE)
+
+
+def _blank_form_metrics():
+    info = _render_blank_form.cache_info()
+    labels = {'cache': 'blank_form'}
+    yield 'imp_cache_hits_total', 'counter', 'Aciertos de las cachés de resultados', labels, info.hits
+    yield 'imp_cache_misses_total', 'counter', 'Fallos de las cachés de resultados', labels, info.misses
 
 
+register_collector(_blank_form_metrics)
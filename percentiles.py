@@ -0,0 +1,124 @@
+# percentiles.py
+
+"""
+Motor de percentiles por edad a partir de config.AGE_RANGES.
+Las bandas de edad se analizan una sola vez y se guardan en arrays ordenados, de modo que
+la banda se localiza por bisección y el percentil se interpola entre los puntos de corte p5–p95.
+"""
+
+from bisect import bisect_right
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from config import AGE_RANGES, INTERPRETATION_MESSAGES
+
+PERCENTILE_KEYS = ('p5', 'p16', 'p25', 'p50', 'p75', 'p95')
+PERCENTILE_LEVELS = np.array([5, 16, 25, 50, 75, 95], dtype=float)
+
+
+class PercentileEngine:
+    """
+    Consulta de percentiles por edad (semanas postmenstruales) y puntuación total.
+    """
+
+    def __init__(self, age_ranges: Dict[str, Dict[str, int]] = None):
+        age_ranges = AGE_RANGES if age_ranges is None else age_ranges
+
+        bands = []
+        for band, cutoffs in age_ranges.items():
+            lower, upper = (int(bound) for bound in band.split('-'))
+            bands.append((lower, upper, band, [cutoffs[key] for key in PERCENTILE_KEYS]))
+        bands.sort()
+
+        self.labels: Tuple[str, ...] = tuple(band for _, _, band, _ in bands)
+        self.lower_bounds = np.array([lower for lower, _, _, _ in bands], dtype=np.int32)
+        self.upper_bounds = np.array([upper for _, upper, _, _ in bands], dtype=np.int32)
+        self.cutoffs = np.array([cutoffs for _, _, _, cutoffs in bands], dtype=float)
+        self._lower_list = self.lower_bounds.tolist()
+
+        for array in (self.lower_bounds, self.upper_bounds, self.cutoffs):
+            array.setflags(write=False)
+
+    def band_index(self, age_weeks: Optional[int]) -> Optional[int]:
+        """
+        Índice de la banda de edad que contiene `age_weeks`, o None si no hay ninguna.
+        """
+        if age_weeks is None:
+            return None
+        index = bisect_right(self._lower_list, age_weeks) - 1
+        if index < 0 or age_weeks > self.upper_bounds[index]:
+            return None
+        return index
+
+    def band_indices(self, ages: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Versión vectorizada de `band_index`: índice de banda de cada edad (recortado al rango
+        válido para poder indexar) y máscara de las edades que caen en alguna banda.
+        Las edades NaN o negativas quedan fuera.
+        """
+        ages = np.asarray(ages, dtype=float)
+        index = np.searchsorted(self.lower_bounds, ages, side='right') - 1
+        valid = (index >= 0) & ~np.isnan(ages)
+        index = np.clip(index, 0, len(self.labels) - 1)
+        valid &= ages <= self.upper_bounds[index]
+        return index, valid
+
+    def band_label(self, age_weeks: Optional[int]) -> Optional[str]:
+        index = self.band_index(age_weeks)
+        return None if index is None else self.labels[index]
+
+    def percentile(self, total_score: float, age_weeks: Optional[int]) -> Optional[float]:
+        """
+        Percentil interpolado linealmente entre los puntos de corte de la banda de edad.
+        Fuera del intervalo p5–p95 se devuelve el extremo correspondiente.
+        """
+        index = self.band_index(age_weeks)
+        if index is None:
+            return None
+        return round(float(np.interp(total_score, self.cutoffs[index], PERCENTILE_LEVELS)), 1)
+
+    def percentiles(self, total_scores: np.ndarray, ages: np.ndarray) -> np.ndarray:
+        """
+        Versión vectorizada de `percentile` para lotes; devuelve NaN donde la edad no tiene banda.
+        """
+        totals = np.asarray(total_scores, dtype=float)
+        index, valid = self.band_indices(ages)
+
+        cutoffs = self.cutoffs[index]
+        # Segmento de interpolación de cada fila: número de puntos de corte superados
+        segment = np.clip((cutoffs <= totals[:, None]).sum(axis=1) - 1, 0, len(PERCENTILE_KEYS) - 2)
+        rows = np.arange(len(totals))
+        low, high = cutoffs[rows, segment], cutoffs[rows, segment + 1]
+        span = high - low
+        fraction = np.clip((totals - low) / np.where(span > 0, span, 1.0), 0.0, 1.0)
+        result = PERCENTILE_LEVELS[segment] + fraction * (
+            PERCENTILE_LEVELS[segment + 1] - PERCENTILE_LEVELS[segment]
+        )
+        return np.where(valid, np.round(result, 1), np.nan)
+
+    def interpretation_key(self, total_score: float, age_weeks: Optional[int]) -> Optional[str]:
+        """
+        Clave de INTERPRETATION_MESSAGES que corresponde a la puntuación para la edad dada.
+        """
+        index = self.band_index(age_weeks)
+        if index is None:
+            return None
+        p5, p16, p25, _, p75, _ = self.cutoffs[index]
+        if total_score < p5:
+            return 'below_p5'
+        if total_score < p16:
+            return 'p5_p16'
+        if total_score < p25:
+            return 'p16_p25'
+        if total_score <= p75:
+            return 'p25_p75'
+        return 'above_p75'
+
+    def interpretation(self, total_score: float, age_weeks: Optional[int]) -> Optional[str]:
+        key = self.interpretation_key(total_score, age_weeks)
+        return None if key is None else INTERPRETATION_MESSAGES[key]
+
+
+# Motor compartido, construido una sola vez al importar el módulo
+PERCENTILE_ENGINE = PercentileEngine()
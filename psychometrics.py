@@ -0,0 +1,209 @@
+# psychometrics.py
+
+"""
+Análisis psicométrico de los ítems a partir de una matriz de respuestas (N × ítems) con MISSING
+en los ítems sin respuesta: dificultad, correlación ítem-total e ítem-resto por ítem y alfa de
+Cronbach (también sin cada ítem) por sección de TEST_SECTIONS y por tipo P/V/A/S/F.
+Todo se calcula con operaciones matriciales sobre máscaras de respuesta; los únicos bucles
+recorren las secciones y los tipos, no las evaluaciones.
+
+Uso:
+    python psychometrics.py evaluaciones.ndjson [--json] [-o informe.json]
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, Any, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from bulk_score import INPUT_FORMATS, infer_format, iter_chunks, iter_records
+from config import ITEM_CATALOG
+from logging_setup import configure_logging, get_logger
+from scoring import IMPValidator
+from vector_scoring import MISSING, RESPONSE_DTYPE, parse_matrix
+
+logger = get_logger('imp.psychometrics')
+
+MIN_VALUES = np.array([min(values) for values in ITEM_CATALOG.valid_values], dtype=float)
+MAX_VALUES = np.array(ITEM_CATALOG.max_values, dtype=float)
+
+
+def _value(value: float, digits: int = 3) -> Optional[float]:
+    return None if not np.isfinite(value) else round(float(value), digits)
+
+
+def _correlations(values: np.ndarray, mask: np.ndarray, totals: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Correlación de Pearson de cada ítem con el total y con el resto (total sin el ítem),
+    sobre las evaluaciones en que el ítem tiene respuesta. Se obtiene de sumas por columna.
+    """
+    weights = mask.astype(float)
+    n = weights.sum(axis=0)
+    sum_x = values.sum(axis=0)
+    sum_xx = (values * values).sum(axis=0)
+    sum_t = totals @ weights
+    sum_tt = (totals * totals) @ weights
+    sum_xt = totals @ values
+
+    def pearson(sum_y, sum_yy, sum_xy):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            covariance = sum_xy - sum_x * sum_y / n
+            variance_x = sum_xx - sum_x * sum_x / n
+            variance_y = sum_yy - sum_y * sum_y / n
+            return covariance / np.sqrt(variance_x * variance_y)
+
+    # Resto = total - ítem
+    sum_r = sum_t - sum_x
+    sum_rr = sum_tt - 2 * sum_xt + sum_xx
+    sum_xr = sum_xt - sum_xx
+    return {
+        'item_total': pearson(sum_t, sum_tt, sum_xt),
+        'item_rest': pearson(sum_r, sum_rr, sum_xr),
+    }
+
+
+def cronbach_alpha(values: np.ndarray, mask: np.ndarray, positions: Sequence[int]) -> Dict[str, Any]:
+    """
+    Alfa de Cronbach de un grupo de ítems con las evaluaciones que los responden todos, y el
+    alfa que quedaría al quitar cada ítem.
+    """
+    positions = list(positions)
+    complete = mask[:, positions].all(axis=1)
+    group = values[complete][:, positions]
+    count, k = group.shape
+    result = {'items': k, 'n': int(count), 'alpha': None, 'alpha_if_deleted': {}}
+    if k < 2 or count < 2:
+        return result
+
+    item_variances = group.var(axis=0, ddof=1)
+    totals = group.sum(axis=1)
+    total_variance = totals.var(ddof=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        alpha = k / (k - 1) * (1 - item_variances.sum() / total_variance)
+        if k > 2:
+            # var(T - x_i) = var(T) + var(x_i) - 2·cov(T, x_i)
+            covariances = ((group - group.mean(axis=0)) * (totals - totals.mean())[:, None]).sum(axis=0) / (count - 1)
+            rest_variances = total_variance + item_variances - 2 * covariances
+            deleted = (k - 1) / (k - 2) * (1 - (item_variances.sum() - item_variances) / rest_variances)
+            result['alpha_if_deleted'] = {
+                ITEM_CATALOG.keys[pos]: _value(value) for pos, value in zip(positions, deleted)
+            }
+    result['alpha'] = _value(alpha)
+    return result
+
+
+def item_analysis(responses: np.ndarray) -> Dict[str, Any]:
+    """
+    Estadísticos por ítem y consistencia interna por sección y por tipo para una matriz de
+    respuestas (N × ítems). Los ítems sin respuesta se excluyen con su máscara.
+    """
+    responses = np.atleast_2d(responses)
+    mask = responses != MISSING
+    values = np.where(mask, responses, 0).astype(float)
+    answered = mask.sum(axis=0)
+    totals = values.sum(axis=1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        means = values.sum(axis=0) / answered
+        difficulty = (means - MIN_VALUES) / (MAX_VALUES - MIN_VALUES)
+    correlations = _correlations(values, mask, totals)
+
+    count = responses.shape[0]
+    items = [
+        {
+            'item': ITEM_CATALOG.keys[pos],
+            'number': ITEM_CATALOG.numbers[pos],
+            'title': ITEM_CATALOG.titles[pos],
+            'section': ITEM_CATALOG.sections[ITEM_CATALOG.section_index[pos]]
+            if ITEM_CATALOG.section_index[pos] >= 0 else None,
+            'type': ITEM_CATALOG.types[ITEM_CATALOG.type_index[pos]],
+            'answered': int(answered[pos]),
+            'answered_rate': _value(answered[pos] / count) if count else None,
+            'mean': _value(means[pos]),
+            'difficulty': _value(difficulty[pos]),
+            'item_total_r': _value(correlations['item_total'][pos]),
+            'item_rest_r': _value(correlations['item_rest'][pos]),
+        }
+        for pos in range(len(ITEM_CATALOG))
+    ]
+
+    type_positions: Dict[str, List[int]] = {item_type: [] for item_type in ITEM_CATALOG.types}
+    for pos, type_pos in enumerate(ITEM_CATALOG.type_index):
+        type_positions[ITEM_CATALOG.types[type_pos]].append(pos)
+
+    return {
+        'count': count,
+        'items': items,
+        'sections': {section: cronbach_alpha(values, mask, ITEM_CATALOG.section_items[section])
+                     for section in ITEM_CATALOG.sections},
+        'types': {item_type: cronbach_alpha(values, mask, positions)
+                  for item_type, positions in type_positions.items()},
+    }
+
+
+def load_responses(records: Iterable[Dict[str, Any]], chunk_size: int = 5000) -> Dict[str, Any]:
+    """
+    Lee las evaluaciones por bloques y apila las respuestas de las válidas en una matriz int8.
+    """
+    blocks = []
+    invalid = 0
+    for chunk in iter_chunks(records, chunk_size):
+        parsed = parse_matrix(chunk)
+        errors = IMPValidator.validate_batch(chunk, parsed)
+        valid = np.array([not record_errors for record_errors in errors], dtype=bool)
+        blocks.append(parsed[valid])
+        invalid += int((~valid).sum())
+    responses = np.vstack(blocks) if blocks else np.empty((0, len(ITEM_CATALOG)), dtype=RESPONSE_DTYPE)
+    return {'responses': responses, 'invalid': invalid}
+
+
+def format_report(analysis: Dict[str, Any]) -> str:
+    """Informe de texto para la línea de comandos"""
+    lines = [f"Evaluaciones: {analysis['count']}", "",
+             f"{'Ítem':>4}  {'Tipo':<4} {'Resp.':>6} {'Media':>6} {'Dific.':>6} {'r it':>6} {'r ir':>6}  Título"]
+
+    def number(value):
+        return '-' if value is None else f"{value:.3f}"
+
+    for item in analysis['items']:
+        lines.append(f"{item['number']:>4}  {item['type']:<4} {item['answered']:>6} "
+                     f"{number(item['mean']):>6} {number(item['difficulty']):>6} "
+                     f"{number(item['item_total_r']):>6} {number(item['item_rest_r']):>6}  {item['title'][:50]}")
+
+    for title, groups in (('Sección', analysis['sections']), ('Tipo', analysis['types'])):
+        lines += ["", f"{title:<12} {'Ítems':>5} {'N':>8} {'Alfa':>6}"]
+        for name, group in groups.items():
+            lines.append(f"{name:<12} {group['items']:>5} {group['n']:>8} {number(group['alpha']):>6}")
+    return '\n'.join(lines)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Análisis psicométrico de los ítems IMP")
+    parser.add_argument('input', help="Fichero de evaluaciones (CSV o NDJSON)")
+    parser.add_argument('--input-format', choices=INPUT_FORMATS,
+                        help="Formato de entrada (por defecto, según la extensión)")
+    parser.add_argument('--json', action='store_true', help="Informe en JSON en lugar de texto")
+    parser.add_argument('-o', '--output', help="Fichero de salida (por defecto, salida estándar)")
+    args = parser.parse_args(argv)
+
+    configure_logging()
+
+    input_format = args.input_format or infer_format(args.input, INPUT_FORMATS, 'csv')
+    loaded = load_responses(iter_records(args.input, input_format))
+    logger.info("Analizando evaluaciones", valid=loaded['responses'].shape[0], invalid=loaded['invalid'])
+
+    analysis = item_analysis(loaded['responses'])
+    analysis['invalid'] = loaded['invalid']
+    output = json.dumps(analysis, indent=2, ensure_ascii=False) if args.json else format_report(analysis)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            handle.write(output + '\n')
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
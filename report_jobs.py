@@ -0,0 +1,188 @@
+# report_jobs.py
+
+"""
+Cola asíncrona de generación de informes PDF.
+Los informes se renderizan en un pool de procesos de ReportLab fuera del hilo de la
+petición y se guardan en una caché en disco acotada por número de entradas y por TTL.
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import partial
+from typing import Dict, Any, Optional
+
+from logging_setup import get_logger
+from scoring import EvaluationResult
+
+logger = get_logger('imp.report_jobs')
+
+# Los workers de gunicorn tienen varios hilos y un fork desde ellos puede dejar al hijo bloqueado
+# en un lock que otro hilo tenía tomado (por ejemplo, el de un handler de logging); los procesos
+# del pool se crean desde un servidor forkserver limpio, o con spawn donde no existe
+MP_CONTEXT = multiprocessing.get_context(
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+)
+
+
+def render_report_to_file(result_payload: Dict[str, Any], path: str) -> int:
+    """
+    Renderiza un informe en un proceso del pool y lo escribe en disco.
+    Se escribe primero a un fichero temporal para que nunca se sirva un PDF a medias.
+    """
+    from pdf_generator import IMPReportGenerator
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as handle:
+        size = IMPReportGenerator().write_result(handle, EvaluationResult.from_dict(result_payload))
+    os.replace(tmp_path, path)
+    return size
+
+
+def _log_failure(job_id: str, future: Future) -> None:
+    """Registra una sola vez, al terminar, el error de un trabajo fallido"""
+    if not future.cancelled() and future.exception() is not None:
+        logger.error("Trabajo de informe fallido", job_id=job_id, error=str(future.exception()))
+
+
+class ReportJob:
+    """
+    Trabajo de generación de un informe.
+    """
+
+    def __init__(self, job_id: str, patient_id: Optional[str], future: Optional[Future]):
+        self.job_id = job_id
+        self.patient_id = patient_id
+        self.future = future
+        self.created = time.time()
+
+
+class ReportJobQueue:
+    """
+    Acepta trabajos de informe, devuelve su ID al instante y los renderiza en segundo plano.
+    """
+
+    def __init__(self, cache_dir: str, max_workers: int = None,
+                 cache_ttl: int = 3600, max_entries: int = 500):
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        self.cache_ttl = cache_ttl
+        self.max_entries = max_entries
+        self._executor = None
+        self._jobs: Dict[str, ReportJob] = {}
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # El pool se crea con el primer trabajo para no lanzar procesos en workers que no generan PDF
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=MP_CONTEXT)
+        return self._executor
+
+    def executor(self) -> ProcessPoolExecutor:
+        """Pool de procesos del worker, compartido con los ZIP de informes de /download_results/bulk"""
+        with self._lock:
+            return self._get_executor()
+
+    def _path(self, job_id: str) -> str:
+        return os.path.join(self.cache_dir, f"{job_id}.pdf")
+
+    def submit(self, result: EvaluationResult) -> str:
+        """
+        Encola la generación del informe de un resultado y devuelve el ID del trabajo.
+        """
+        self.evict_expired()
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            future = self._get_executor().submit(
+                render_report_to_file, result.to_dict(), self._path(job_id)
+            )
+            self._jobs[job_id] = ReportJob(job_id, result.data.get('patientId'), future)
+        future.add_done_callback(partial(_log_failure, job_id))
+        logger.info("Trabajo de informe encolado", job_id=job_id)
+        return job_id
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Devuelve el estado de un trabajo, o None si no existe o ha caducado.
+        Un PDF presente en la caché se considera terminado aunque lo haya encolado otro proceso.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+
+        if job is None:
+            if self.pdf_path(job_id) is None:
+                return None
+            return {'job_id': job_id, 'status': 'done'}
+
+        info = {'job_id': job_id, 'patientId': job.patient_id, 'created': job.created}
+        if not job.future.done():
+            info['status'] = 'running' if job.future.running() else 'pending'
+        elif job.future.exception() is not None:
+            info['status'] = 'error'
+            info['error'] = 'Error generando el informe de resultados'
+        elif self.pdf_path(job_id) is None:
+            info['status'] = 'expired'
+        else:
+            info['status'] = 'done'
+            info['size'] = job.future.result()
+        return info
+
+    def pdf_path(self, job_id: str) -> Optional[str]:
+        """
+        Ruta del PDF terminado, o None si todavía no existe o ha caducado.
+        """
+        if not job_id.isalnum():
+            return None
+        path = self._path(job_id)
+        try:
+            if time.time() - os.path.getmtime(path) > self.cache_ttl:
+                return None
+        except OSError:
+            return None
+        return path
+
+    def evict_expired(self) -> None:
+        """
+        Elimina los PDF caducados y, si se supera el máximo de entradas, los más antiguos.
+        """
+        now = time.time()
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.pdf'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
+                continue
+            if now - mtime > self.cache_ttl:
+                self._remove(path)
+            else:
+                entries.append((mtime, path))
+
+        entries.sort()
+        for _, path in entries[:max(0, len(entries) - self.max_entries)]:
+            self._remove(path)
+
+        with self._lock:
+            for job_id in [job_id for job_id, job in self._jobs.items()
+                           if job.future.done() and now - job.created > self.cache_ttl]:
+                del self._jobs[job_id]
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def shutdown(self) -> None:
+        """Cancela los trabajos pendientes y cierra el pool; se llama al terminar el worker"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
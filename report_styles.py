@@ -0,0 +1,286 @@
+# report_styles.py
+
+"""
+Estilos y plantillas de gráficos compartidos por todo el proceso.
+Se construyen una sola vez al importar el módulo; cada informe sólo vincula sus datos.
+Ninguno de estos objetos debe modificarse después de su creación.
+"""
+
+from types import MappingProxyType
+
+from reportlab.graphics.charts.barcharts import VerticalBarChart
+from reportlab.graphics.charts.lineplots import LinePlot
+from reportlab.graphics.charts.spider import SpiderChart
+from reportlab.graphics.widgets.markers import makeMarker
+from reportlab.graphics.shapes import Group, Line, String
+from reportlab.lib import colors
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import TableStyle
+
+# Paleta de los informes PDF y del gráfico de perfil por secciones
+COLORS = MappingProxyType({
+    'background': colors.HexColor('#E3ECFC'),  # Azul claro pastel
+    'main': colors.HexColor('#4E73DF'),        # Azul principal vibrante
+    'fill': colors.HexColor('#AFC8F5'),        # Azul suave para relleno
+    'grid': colors.HexColor('#BFD3F2'),        # Azul grisáceo para la grilla
+    'text': colors.HexColor('#374151'),        # Gris oscuro para el texto
+    'highlight': colors.HexColor('#1E40AF')    # Azul profundo para detalles
+})
+
+# Paleta del gráfico de barras por tipo de habilidad
+CHART_COLORS = MappingProxyType({
+    'bar_fill': colors.HexColor('#4e73df'),  # Azul moderno
+    'bar_hover': colors.HexColor('#2e59d9'),  # Azul oscuro para bordes
+    'grid': colors.HexColor('#eaecf4'),  # Gris muy claro para la grilla
+    'text': colors.HexColor('#5a5c69'),  # Gris oscuro para texto
+    'reference': colors.HexColor('#e74a3b')  # Rojo moderno para línea de referencia
+})
+
+TYPE_LABELS = MappingProxyType({
+    'P': 'Rendimiento',
+    'V': 'Variedad',
+    'A': 'Adaptabilidad',
+    'S': 'Simetría',
+    'F': 'Fluidez'
+})
+
+# Nombres cortos de las secciones para el gráfico de perfil
+SECTION_SHORT_NAMES = MappingProxyType({
+    'Posición Boca Arriba (Decúbito Supino)': 'Boca Arriba',
+    'Posición Boca Abajo (Decúbito Prono)': 'Boca Abajo',
+    'Posición Sentada (Sedestación)': 'Sentada',
+    'Posición de Pie (Bipedestación) y Marcha': 'De Pie',
+    'Alcance, agarre y manipulación de objetos durante sedestación': 'Manipulación',
+    'General: Ítems observados durante la evaluación': 'General'
+})
+
+# =========================================================
+# ESTILOS DE PÁRRAFO Y TABLA
+# =========================================================
+
+SAMPLE_STYLES = getSampleStyleSheet()
+
+TITLE_STYLE = ParagraphStyle(
+    'CustomTitle',
+    parent=SAMPLE_STYLES['Heading1'],
+    fontSize=13,
+    spaceAfter=10,
+    alignment=1
+)
+
+SUBTITLE_STYLE = ParagraphStyle(
+    'CustomSubTitle',
+    parent=SAMPLE_STYLES['Heading2'],
+    fontSize=12,
+    spaceAfter=8
+)
+
+NORMAL_STYLE = ParagraphStyle(
+    'CustomNormal',
+    parent=SAMPLE_STYLES['Normal'],
+    fontSize=10,
+    spaceBefore=6,
+    spaceAfter=6
+)
+
+OPTIONS_STYLE = ParagraphStyle(
+    'Options',
+    parent=SAMPLE_STYLES['Normal'],
+    fontSize=9,
+    leftIndent=20,
+    spaceBefore=2,
+    spaceAfter=2
+)
+
+INFO_TABLE_STYLE = TableStyle([
+    ('GRID', (0, 0), (-1, -1), 0.5, COLORS['grid']),  # Azul grisáceo en lugar de gris
+    ('PADDING', (0, 0), (-1, -1), 4),
+    ('BACKGROUND', (0, 0), (-1, 0), COLORS['fill']),  # Azul claro en lugar de lightgrey
+    ('TEXTCOLOR', (0, 0), (-1, -1), COLORS['text'])  # Texto en gris oscuro
+])
+
+SECTION_TABLE_STYLE = TableStyle([
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+    ('PADDING', (0, 0), (-1, -1), 6),
+    ('ALIGN', (-1, 0), (-1, -1), 'CENTER'),
+])
+
+# Tablas compactas de detalle de ítems (una por sección). Las celdas son texto plano ya
+# partido en líneas con simpleSplit para estas fuentes y anchos, sin párrafos que maquetar
+DETAIL_FONT = 'Helvetica'
+DETAIL_FONT_SIZE = 8
+DETAIL_LEADING = 9.5
+DETAIL_PADDING = 3
+# Anchos de columna en puntos; suman el ancho útil de A4 con márgenes de 72
+RESULTS_DETAIL_WIDTHS = (24, 205, 28, 194)  # Nº, ítem, tipo, respuesta
+BLANK_DETAIL_WIDTHS = (24, 150, 277)  # Nº, ítem, opciones
+
+DETAIL_TABLE_STYLE = TableStyle([
+    ('FONT', (0, 0), (-1, -1), DETAIL_FONT, DETAIL_FONT_SIZE, DETAIL_LEADING),
+    ('FONT', (0, 0), (-1, 0), 'Helvetica-Bold', DETAIL_FONT_SIZE, DETAIL_LEADING),
+    ('TEXTCOLOR', (0, 0), (-1, -1), COLORS['text']),
+    ('BACKGROUND', (0, 0), (-1, 0), COLORS['fill']),
+    ('GRID', (0, 0), (-1, -1), 0.25, COLORS['grid']),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ('PADDING', (0, 0), (-1, -1), DETAIL_PADDING),
+])
+
+# =========================================================
+# PLANTILLAS DE GRÁFICOS
+# =========================================================
+
+TYPE_CHART_SIZE = (400, 200)
+SECTION_CHART_SIZE = (400, 300)
+TRAJECTORY_CHART_SIZE = (420, 260)
+
+# Geometría del gráfico de barras (x, y, ancho, alto)
+TYPE_CHART_BOX = (50, 50, 300, 125)
+
+
+def new_type_scores_chart() -> VerticalBarChart:
+    """
+    Gráfico de barras por tipo ya configurado, a falta de vincular datos y etiquetas.
+    Los widgets de ReportLab no admiten copia profunda, así que cada informe crea el suyo
+    a partir de esta plantilla.
+    """
+    bc = VerticalBarChart()
+    bc.x, bc.y, bc.width, bc.height = TYPE_CHART_BOX
+
+    # Configuración del eje de valores
+    bc.valueAxis.strokeColor = CHART_COLORS['grid']
+    bc.valueAxis.gridStrokeColor = CHART_COLORS['grid']
+    bc.valueAxis.labelTextFormat = '%d%%'
+    bc.valueAxis.labels.fontSize = 8
+    bc.valueAxis.strokeWidth = 0.5
+    bc.valueAxis.gridStrokeWidth = 0.5
+    bc.valueAxis.labels.fontName = 'Helvetica'
+    bc.valueAxis.labels.fillColor = CHART_COLORS['text']
+    bc.valueAxis.valueMin = 0
+    bc.valueAxis.valueMax = 100
+    bc.valueAxis.valueStep = 20
+
+    # Configuración del eje de categorías
+    bc.categoryAxis.strokeColor = CHART_COLORS['grid']
+    bc.categoryAxis.gridStrokeColor = CHART_COLORS['grid']
+    bc.categoryAxis.strokeWidth = 0.5
+    bc.categoryAxis.gridStrokeWidth = 0
+    bc.categoryAxis.labels.fontName = 'Helvetica-Bold'
+    bc.categoryAxis.labels.fontSize = 8
+    bc.categoryAxis.labels.fillColor = CHART_COLORS['text']
+    bc.categoryAxis.labels.boxAnchor = 'n'
+    bc.categoryAxis.labels.dx = 0
+    bc.categoryAxis.labels.dy = -5
+    bc.categoryAxis.labels.angle = 0
+
+    # Estilo de las barras
+    bc.bars[0].fillColor = CHART_COLORS['bar_fill']
+    bc.bars[0].strokeColor = CHART_COLORS['bar_hover']
+    bc.bars[0].strokeWidth = 1
+    bc.barWidth = 0.75
+    return bc
+
+
+def new_section_scores_chart() -> SpiderChart:
+    """
+    Gráfico de perfil por secciones ya configurado, a falta de vincular datos y etiquetas.
+    """
+    spider = SpiderChart()
+    spider.x = 50
+    spider.y = 50  # Ajustado para centrar mejor
+    spider.width = 300
+    spider.height = 200
+
+    spider.strands[0].strokeColor = COLORS['main']
+    spider.strands[0].strokeWidth = 2
+    spider.strands[0].fillColor = COLORS['fill']
+    spider.spokes.strokeColor = COLORS['grid']
+    spider.spokes.strokeWidth = 0.5
+    spider.spokeLabels.fontName = 'Helvetica-Bold'
+    spider.spokeLabels.fontSize = 10  # Aumentado para mayor legibilidad
+    return spider
+
+
+def new_trajectory_chart() -> LinePlot:
+    """
+    Gráfico de líneas de la trayectoria (puntuación total frente a edad) ya configurado.
+    La primera línea es la del paciente; las siguientes, las bandas p5, p50 y p95.
+    """
+    plot = LinePlot()
+    plot.x = 50
+    plot.y = 40
+    plot.width = 340
+    plot.height = 180
+
+    plot.xValueAxis.labels.fontSize = 8
+    plot.xValueAxis.labels.fillColor = COLORS['text']
+    plot.xValueAxis.strokeColor = COLORS['grid']
+    plot.yValueAxis.labels.fontSize = 8
+    plot.yValueAxis.labels.fillColor = COLORS['text']
+    plot.yValueAxis.strokeColor = COLORS['grid']
+    plot.yValueAxis.gridStrokeColor = COLORS['grid']
+    plot.yValueAxis.gridStrokeWidth = 0.5
+    plot.yValueAxis.visibleGrid = 1
+
+    plot.lines[0].strokeColor = COLORS['highlight']
+    plot.lines[0].strokeWidth = 2
+    plot.lines[0].symbol = makeMarker('FilledCircle', size=4)
+    for index, color in ((1, CHART_COLORS['reference']), (2, COLORS['main']), (3, CHART_COLORS['reference'])):
+        plot.lines[index].strokeColor = color
+        plot.lines[index].strokeWidth = 0.75
+        plot.lines[index].strokeDashArray = [4, 2]
+    return plot
+
+
+def _type_chart_decorations() -> Group:
+    x, y, width, height = TYPE_CHART_BOX
+    return Group(
+        # Línea de referencia al 100%
+        Line(
+            x, y + height,
+            x + width, y + height,
+            strokeColor=CHART_COLORS['reference'],
+            strokeWidth=1,
+            strokeDashArray=[4, 2]
+        ),
+        String(
+            TYPE_CHART_SIZE[0] / 2,
+            TYPE_CHART_SIZE[1] - 20,
+            'Puntuaciones por Tipo de Habilidad',
+            fontSize=12,
+            fontName='Helvetica-Bold',
+            fillColor=CHART_COLORS['text'],
+            textAnchor='middle'
+        ),
+        String(
+            TYPE_CHART_SIZE[0] / 2,
+            TYPE_CHART_SIZE[1] - 35,
+            'Porcentajes alcanzados en cada área',
+            fontSize=8,
+            fontName='Helvetica',
+            fillColor=CHART_COLORS['text'],
+            textAnchor='middle'
+        )
+    )
+
+
+def _section_chart_decorations() -> Group:
+    return Group(
+        String(200, 280, 'Perfil de desarrollo',
+               fontSize=14, fontName='Helvetica-Bold', fillColor=COLORS['text'], textAnchor='middle')
+    )
+
+
+def _trajectory_chart_decorations() -> Group:
+    return Group(
+        String(TRAJECTORY_CHART_SIZE[0] / 2, TRAJECTORY_CHART_SIZE[1] - 15, 'Trayectoria de la puntuación total',
+               fontSize=12, fontName='Helvetica-Bold', fillColor=COLORS['text'], textAnchor='middle'),
+        String(TRAJECTORY_CHART_SIZE[0] / 2, 10, 'Edad postmenstrual (semanas) — líneas discontinuas: p5, p50 y p95',
+               fontSize=8, fontName='Helvetica', fillColor=COLORS['text'], textAnchor='middle')
+    )
+
+
+# Elementos estáticos de los gráficos; se comparten entre dibujos porque el renderizado no los modifica
+TYPE_CHART_DECORATIONS = _type_chart_decorations()
+SECTION_CHART_DECORATIONS = _section_chart_decorations()
+TRAJECTORY_CHART_DECORATIONS = _trajectory_chart_decorations()
@@ -0,0 +1,190 @@
+# result_cache.py
+
+"""
+Memoización de resultados de evaluación y de informes PDF.
+Las claves son un hash canónico de las respuestas normalizadas (vector int8 en el orden de
+ITEM_CATALOG) y de la edad, de forma que dos envíos con los mismos datos comparten entrada
+aunque difieran en el orden de los campos o en espacios. Las cachés son LRU con caducidad y
+cuentan aciertos y fallos para la monitorización.
+"""
+
+import hashlib
+import io
+import json
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import BinaryIO, Dict, Any, Callable, Hashable, Optional
+
+from config import ADDITIONAL_OBSERVATIONS, ITEM_CATALOG, RESULT_CACHE
+from instrumentation import register_collector
+from scoring import EvaluationResult, IMPScorer, ParsedResponses
+
+# Campos de cabecera que se imprimen en el informe PDF
+_REPORT_FIELDS = ('patientId', 'evaluationDate', 'age_weeks', 'evaluator')
+
+
+class ResultCache:
+    """
+    Caché LRU acotada con caducidad por entrada, segura entre hilos.
+    Los valores se comparten entre peticiones y no deben modificarse.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Devuelve el valor en caché o lo calcula y lo guarda. Dos peticiones simultáneas con la
+        misma clave pueden calcularlo las dos; el resultado es el mismo, así que no se bloquea.
+        """
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+def evaluation_key(responses: ParsedResponses) -> str:
+    """
+    Hash canónico de una evaluación: configuración de ítems, edad y respuestas normalizadas.
+    """
+    digest = hashlib.sha256()
+    digest.update(ITEM_CATALOG.config_hash.encode())
+    digest.update(str(responses.age_weeks).encode())
+    digest.update(responses.responses.tobytes())
+    return digest.hexdigest()
+
+
+def report_key(result: EvaluationResult) -> str:
+    """
+    Clave del informe PDF: además de respuestas y edad incluye la cabecera, las observaciones
+    y la fecha del día, porque todo ello se imprime en el documento.
+    """
+    data = result.data
+    printed = {field: str(data.get(field) or '') for field in _REPORT_FIELDS}
+    printed.update({key: str(data[key]) for key in ADDITIONAL_OBSERVATIONS if data.get(key)})
+    digest = hashlib.sha256()
+    digest.update(evaluation_key(result.responses).encode())
+    digest.update(json.dumps(printed, sort_keys=True, ensure_ascii=False).encode())
+    digest.update(date.today().isoformat().encode())
+    return digest.hexdigest()
+
+
+# Cachés compartidas por el proceso
+SCORE_CACHE = ResultCache(RESULT_CACHE['max_entries'], RESULT_CACHE['ttl'])
+REPORT_CACHE = ResultCache(RESULT_CACHE['report_max_entries'], RESULT_CACHE['ttl'])
+
+
+def evaluate_cached(scorer: IMPScorer, data: Dict[str, Any],
+                    responses: ParsedResponses = None) -> EvaluationResult:
+    """
+    Puntúa e interpreta una evaluación ya validada, reutilizando el resultado de un envío
+    idéntico. Los datos del formulario del resultado son siempre los de esta petición.
+    """
+    if responses is None:
+        responses = ParsedResponses.from_data(data)
+    cached = SCORE_CACHE.get_or_compute(evaluation_key(responses),
+                                        lambda: scorer.evaluate(data, responses))
+    if cached.data == data:
+        return cached
+    return EvaluationResult(
+        data=dict(data),
+        scores=cached.scores,
+        interpretation=cached.interpretation,
+        detailed_analysis=cached.detailed_analysis,
+        responses=responses
+    )
+
+
+def open_result_report(generator, result: EvaluationResult) -> BinaryIO:
+    """
+    Informe PDF de un resultado como fichero listo para enviarse por bloques, en la posición 0.
+    Un acierto de caché se sirve sin copiar los bytes guardados. Si no, el PDF se genera en
+    memoria (ReportLab lo construye entero igualmente) y se guarda en caché si no pasa de
+    RESULT_CACHE['report_max_bytes']; los mayores se vuelcan a un fichero temporal en disco,
+    que el servidor puede enviar con sendfile, y se libera la copia en memoria.
+    """
+    key = report_key(result)
+    cached = REPORT_CACHE.get(key)
+    if cached is not None:
+        return io.BytesIO(cached)
+
+    buffer = io.BytesIO()
+    size = generator.write_result(buffer, result)
+    if size <= RESULT_CACHE['report_max_bytes']:
+        pdf_bytes = buffer.getvalue()
+        REPORT_CACHE.put(key, pdf_bytes)
+        return io.BytesIO(pdf_bytes)
+
+    pdf_file = tempfile.NamedTemporaryFile()
+    try:
+        pdf_file.write(buffer.getbuffer())
+        pdf_file.seek(0)
+    except Exception:
+        pdf_file.close()
+        raise
+    return pdf_file
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    return {'scores': SCORE_CACHE.stats(), 'reports': REPORT_CACHE.stats()}
+
+
+def _cache_metrics():
+    for cache_name, stats in cache_stats().items():
+        labels = {'cache': cache_name}
+        yield 'imp_cache_hits_total', 'counter', 'Aciertos de las cachés de resultados', labels, stats['hits']
+        yield 'imp_cache_misses_total', 'counter', 'Fallos de las cachés de resultados', labels, stats['misses']
+        yield 'imp_cache_evictions_total', 'counter', 'Entradas expulsadas por tamaño', labels, stats['evictions']
+        yield 'imp_cache_entries', 'gauge', 'Entradas en las cachés de resultados', labels, stats['entries']
+        yield 'imp_cache_hit_ratio', 'gauge', 'Proporción de aciertos de las cachés', labels, stats['hit_rate']
+
+
+register_collector(_cache_metrics)
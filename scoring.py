@@ -1,13 +1,108 @@
 # scoring.py
 
-from typing import Dict, Any, Tuple, List
+from dataclasses import dataclass, field
+from typing import Dict, Any, Tuple, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
 from config import (
-    ALL_ITEMS,
-    OBSERVED_ITEMS,
-    PROVOKED_ITEMS,
+    ITEM_CATALOG,
     TEST_SECTIONS,
     SECTION_WEIGHTS
 )
+from instrumentation import timed
+from logging_setup import get_logger
+from percentiles import PERCENTILE_ENGINE
+from vector_scoring import (
+    MISSING,
+    RESPONSE_DTYPE,
+    parse_matrix,
+    invalid_mask,
+    response_vector,
+    score_matrix,
+    scores_to_dict
+)
+
+logger = get_logger('imp.scoring')
+
+# Campos básicos obligatorios de cada evaluación
+REQUIRED_FIELDS = {
+    'patientId': 'ID del paciente',
+    'evaluationDate': 'Fecha de evaluación',
+    'evaluator': 'Evaluador'
+}
+
+
+def _parse_age_weeks(data: Dict[str, Any]) -> Optional[int]:
+    age_weeks = str(data.get('age_weeks', ''))
+    return int(age_weeks) if age_weeks.isdigit() else None
+
+
+def _freeze(vector: np.ndarray) -> np.ndarray:
+    vector.setflags(write=False)
+    return vector
+
+
+class ParsedResponses(NamedTuple):
+    """
+    Respuestas de una evaluación ya convertidas: vector int8 de sólo lectura en el orden de
+    ITEM_CATALOG (MISSING si el ítem no tiene respuesta; 0 es una respuesta válida) y edad en semanas.
+    """
+    responses: np.ndarray
+    age_weeks: Optional[int]
+
+    @classmethod
+    def from_data(cls, data: Dict[str, Any]) -> 'ParsedResponses':
+        """
+        Convierte un formulario sin validarlo; las respuestas no válidas quedan como MISSING.
+        """
+        return cls(_freeze(response_vector(data)), _parse_age_weeks(data))
+
+    def value(self, pos: int) -> Optional[int]:
+        value = int(self.responses[pos])
+        return None if value == MISSING else value
+
+    def values(self) -> List[Optional[int]]:
+        return [None if value == MISSING else value for value in self.responses.tolist()]
+
+
+@dataclass(frozen=True)
+class EvaluationResult:
+    """
+    Resultado completo de una evaluación: datos del formulario, puntuaciones,
+    interpretación y análisis detallado. Se calcula una sola vez por evaluación.
+    Las respuestas convertidas no se serializan; se reconstruyen a partir de los datos.
+    """
+    data: Dict[str, Any]
+    scores: Dict[str, Any]
+    interpretation: str
+    detailed_analysis: Dict[str, Any]
+    responses: Optional[ParsedResponses] = field(default=None, compare=False, repr=False)
+
+    def __post_init__(self):
+        if self.responses is None:
+            object.__setattr__(self, 'responses', ParsedResponses.from_data(self.data))
+
+    @property
+    def age_weeks(self) -> Optional[int]:
+        return self.responses.age_weeks
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'data': self.data,
+            'scores': self.scores,
+            'interpretation': self.interpretation,
+            'detailed_analysis': self.detailed_analysis
+        }
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> 'EvaluationResult':
+        return cls(
+            data=payload['data'],
+            scores=payload['scores'],
+            interpretation=payload['interpretation'],
+            detailed_analysis=payload['detailed_analysis']
+        )
 
 
 class IMPValidator:
@@ -15,38 +110,71 @@ class IMPValidator:
     Validador de datos del formulario IMP.
     """
 
+    @staticmethod
+    @timed('validation')
+    def parse_form_data(data: Dict[str, Any]) -> Tuple[Optional[ParsedResponses], List[str]]:
+        """
+        Valida y convierte el formulario en una sola pasada contra los valores permitidos
+        de cada ítem. Devuelve las respuestas convertidas (None si hay errores) y la lista
+        completa de errores encontrados.
+        """
+        errors = [f"El campo {name} es obligatorio"
+                  for field_name, name in REQUIRED_FIELDS.items() if not data.get(field_name)]
+
+        values = []
+        for item_name, title, valid_values in zip(
+                ITEM_CATALOG.keys, ITEM_CATALOG.titles, ITEM_CATALOG.valid_values):
+            raw = data.get(item_name)
+            if raw is None or raw == '':
+                values.append(MISSING)
+                continue
+            try:
+                value = int(raw)
+            except (ValueError, TypeError):
+                errors.append(f"Valor no numérico para {title}")
+                values.append(MISSING)
+                continue
+            if value not in valid_values:
+                errors.append(f"Valor inválido para {title}")
+                value = MISSING
+            values.append(value)
+
+        if errors:
+            return None, errors
+        return ParsedResponses(_freeze(np.array(values, dtype=RESPONSE_DTYPE)),
+                               _parse_age_weeks(data)), errors
+
     @staticmethod
     def validate_form_data(data: Dict[str, Any]) -> Tuple[bool, str]:
         """
-        Valida los datos del formulario.
+        Valida los datos del formulario; el mensaje reúne todos los errores encontrados.
         """
-        try:
-            # Validación de campos básicos
-            required_fields = {
-                'patientId': 'ID del paciente',
-                'evaluationDate': 'Fecha de evaluación',
-                'evaluator': 'Evaluador'
-            }
+        _, errors = IMPValidator.parse_form_data(data)
+        return not errors, '; '.join(errors)
 
-            for field, name in required_fields.items():
-                if not data.get(field):
-                    return False, f"El campo {name} es obligatorio"
+    @staticmethod
+    @timed('validation_batch')
+    def validate_batch(records: Sequence[Dict[str, Any]], parsed: np.ndarray) -> List[List[str]]:
+        """
+        Valida un lote de evaluaciones ya convertido a matriz (N × ítems) y devuelve,
+        para cada registro, la lista completa de errores encontrados.
+        """
+        not_numeric, not_allowed = invalid_mask(parsed)
+        errors = [[] for _ in records]
 
-            # Validación de ítems
-            for item_name, item_config in ALL_ITEMS.items():
-                if item_name in data and data[item_name]:
-                    try:
-                        value = int(data[item_name])
-                        valid_values = [opt['value'] for opt in item_config['options']]
-                        if value not in valid_values:
-                            return False, f"Valor inválido para {item_config['title']}"
-                    except ValueError:
-                        return False, f"Valor no numérico para {item_config['title']}"
+        for row, data in enumerate(records):
+            for field_name, name in REQUIRED_FIELDS.items():
+                if not data.get(field_name):
+                    errors[row].append(f"El campo {name} es obligatorio")
 
-            return True, ""
+        for row, pos in zip(*np.nonzero(not_numeric | not_allowed)):
+            title = ITEM_CATALOG.titles[pos]
+            if not_numeric[row, pos]:
+                errors[row].append(f"Valor no numérico para {title}")
+            else:
+                errors[row].append(f"Valor inválido para {title}")
 
-        except Exception as e:
-            return False, f"Error en la validación: {str(e)}"
+        return errors
 
 
 class IMPScorer:
@@ -54,86 +182,122 @@ class IMPScorer:
     Calculador de puntuaciones de la escala IMP.
     """
 
-    def calculate_score(self, data: Dict[str, Any]) -> Dict[str, Any]:
+    @timed('scoring')
+    def calculate_score(self, responses: ParsedResponses) -> Dict[str, Any]:
         """
         Calcula las puntuaciones totales y por tipo.
         """
+        values = responses.values()
         scores = {}
 
         # Calcular puntuación para cada sección
         for section in TEST_SECTIONS.keys():
-            scores[section] = self._calculate_section_score(data, section)
+            scores[section] = self._calculate_section_score(values, section)
 
         # Calcular totales por tipo de habilidad
-        type_scores = self._calculate_type_scores(data)
+        type_scores = self._calculate_type_scores(values)
         scores['type_scores'] = type_scores
 
         # Calcular totales por tipo de ítem observado/provocado
         scores['observed'] = sum(
-            int(data.get(item, 0))
-            for item in OBSERVED_ITEMS
-            if item in data
+            value for value, observed in zip(values, ITEM_CATALOG.observed)
+            if observed and value is not None
         )
 
         scores['provoked'] = sum(
-            int(data.get(item, 0))
-            for item in PROVOKED_ITEMS
-            if item in data
+            value for value, provoked in zip(values, ITEM_CATALOG.provoked)
+            if provoked and value is not None
         )
 
         # Cálculo del total
-        scores['total'] = sum(
-            int(data.get(item, 0))
-            for item in ALL_ITEMS
-            if item in data
-        )
+        scores['total'] = sum(value for value in values if value is not None)
 
         return scores
 
-    def _calculate_section_score(self, data: Dict[str, Any], section: str) -> float:
+    def evaluate(self, data: Dict[str, Any], responses: ParsedResponses = None) -> EvaluationResult:
         """
-        Calcula la puntuación para una sección específica.
+        Puntúa e interpreta una evaluación ya validada en una sola pasada.
+        Si no se pasan las respuestas convertidas por parse_form_data, se obtienen de los datos.
         """
-        score = 0
-        section_info = TEST_SECTIONS[section]
+        if responses is None:
+            responses = ParsedResponses.from_data(data)
+        return self._build_result(data, self.calculate_score(responses), responses)
 
-        for item_name, item_config in ALL_ITEMS.items():
-            if (item_config['section'] == section and
-                    item_name in data and
-                    data[item_name] and
-                    item_config['number'] >= section_info['start'] and
-                    item_config['number'] <= section_info['end']):
-                try:
-                    score += int(data[item_name])
-                except (ValueError, TypeError):
-                    continue
+    def evaluate_batch(self, records: Sequence[Dict[str, Any]]
+                       ) -> Tuple[List[Optional[EvaluationResult]], List[List[str]]]:
+        """
+        Valida, puntúa e interpreta un lote de evaluaciones.
+        Devuelve el resultado de cada registro (None si no es válido) y sus errores.
+        """
+        batch_scores, errors, responses = self.calculate_scores_batch(records)
+        results = [
+            None if scores is None else self._build_result(
+                data, scores, ParsedResponses(_freeze(responses[row]), _parse_age_weeks(data)))
+            for row, (data, scores) in enumerate(zip(records, batch_scores))
+        ]
+        return results, errors
 
-        return score
+    def _build_result(self, data: Dict[str, Any], scores: Dict[str, Any],
+                      responses: ParsedResponses) -> EvaluationResult:
+        age_weeks = responses.age_weeks
 
-    def _calculate_type_scores(self, data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        with timed('interpretation'):
+            interpretation = self.interpret_score(scores['total'], age_weeks)
+            detailed_analysis = self.get_detailed_analysis(scores, age_weeks, interpretation)
+        logger.debug("Evaluación puntuada", total=scores['total'], age_weeks=age_weeks,
+                     percentile=detailed_analysis['percentile'])
+        return EvaluationResult(
+            data=dict(data),
+            scores=scores,
+            interpretation=interpretation,
+            detailed_analysis=detailed_analysis,
+            responses=responses
+        )
+
+    @timed('scoring_batch')
+    def calculate_scores_batch(self, records: Sequence[Dict[str, Any]]
+                               ) -> Tuple[List[Optional[Dict[str, Any]]], List[List[str]], np.ndarray]:
+        """
+        Valida y puntúa un lote de evaluaciones como una única matriz (N × ítems).
+        Devuelve las puntuaciones de cada registro (None si no es válido), sus errores y la
+        matriz de respuestas normalizadas (MISSING si no hay respuesta), para no volver a convertirlas.
+        """
+        parsed = parse_matrix(records)
+        errors = IMPValidator.validate_batch(records, parsed)
+
+        responses = np.where(parsed < MISSING, MISSING, parsed)
+        totals, maxima = score_matrix(responses)
+
+        results = [
+            None if errors[row] else scores_to_dict(totals[row], maxima[row])
+            for row in range(len(records))
+        ]
+        return results, errors, responses
+
+    def _calculate_section_score(self, values: List[Optional[int]], section: str) -> float:
+        """
+        Calcula la puntuación para una sección específica.
+        """
+        return sum(
+            values[pos] for pos in ITEM_CATALOG.section_items[section]
+            if values[pos] is not None
+        )
+
+    def _calculate_type_scores(self, values: List[Optional[int]]) -> Dict[str, Dict[str, Any]]:
         """
         Calcula las puntuaciones por tipo de habilidad (P, V, A, S, F)
         """
         type_scores = {
-            'P': {'total': 0, 'max': 0, 'percentage': 0},
-            'V': {'total': 0, 'max': 0, 'percentage': 0},
-            'A': {'total': 0, 'max': 0, 'percentage': 0},
-            'S': {'total': 0, 'max': 0, 'percentage': 0},
-            'F': {'total': 0, 'max': 0, 'percentage': 0}
+            item_type: {'total': 0, 'max': 0, 'percentage': 0}
+            for item_type in ITEM_CATALOG.types
         }
 
-        for item_name, item_info in ALL_ITEMS.items():
-            if item_name in data and data[item_name]:
-                item_type = item_info['type']
-                try:
-                    value = int(data[item_name])
-                    # Encontrar el valor máximo posible para este ítem
-                    max_value = max(opt['value'] for opt in item_info['options'] if 'value' in opt)
-
-                    type_scores[item_type]['total'] += value
-                    type_scores[item_type]['max'] += max_value
-                except (ValueError, TypeError):
-                    continue
+        for value, type_pos, max_value in zip(values, ITEM_CATALOG.type_index, ITEM_CATALOG.max_values):
+            if value is None:
+                continue
+            entry = type_scores[ITEM_CATALOG.types[type_pos]]
+            entry['total'] += value
+            entry['max'] += max_value
 
         # Calcular porcentajes
         for type_key in type_scores:
@@ -146,13 +310,15 @@ class IMPScorer:
 
     def interpret_score(self, total_score: int, age_weeks: int = None) -> str:
         """
-        Provee una interpretación básica basada en el porcentaje de la puntuación total.
+        Interpreta la puntuación total según los percentiles de la banda de edad (AGE_RANGES).
+        Sin edad o fuera de las bandas, se usa el porcentaje sobre la puntuación máxima.
         """
-        # Calculamos el máximo posible (suma de los valores máximos de cada ítem)
-        max_possible = sum(
-            max(opt['value'] for opt in item_info['options'] if 'value' in opt)
-            for item_info in ALL_ITEMS.values()
-        )
+        age_interpretation = PERCENTILE_ENGINE.interpretation(total_score, age_weeks)
+        if age_interpretation is not None:
+            return age_interpretation
+
+        # Máximo posible precalculado en el catálogo (suma de los valores máximos de cada ítem)
+        max_possible = ITEM_CATALOG.total_max
 
         percentage = (total_score / max_possible) * 100 if max_possible > 0 else 0
 
@@ -165,10 +331,17 @@ class IMPScorer:
         else:
             return "La puntuación indica un rendimiento por encima de lo esperado."
 
-    def get_detailed_analysis(self, scores: Dict[str, Any], age_weeks: int = None) -> Dict[str, Any]:
+    def get_detailed_analysis(self, scores: Dict[str, Any], age_weeks: int = None,
+                              interpretation: str = None) -> Dict[str, Any]:
         """
         Genera análisis detallado de puntuaciones.
+        Si ya se dispone de la interpretación, se reutiliza en lugar de recalcularla.
         """
+        if interpretation is None:
+            interpretation = self.interpret_score(scores.get('total', 0), age_weeks)
+
+        percentile = PERCENTILE_ENGINE.percentile(scores.get('total', 0), age_weeks)
+
         return {
             'scores': scores,
             'section_scores': {
@@ -177,6 +350,22 @@ class IMPScorer:
             },
             'type_scores': scores.get('type_scores', {}),
             'total_score': scores.get('total', 0),
-            'interpretation': self.interpret_score(scores.get('total', 0)),
-            'percentile': 'N/A'  # Mantenemos este campo pero lo marcamos como no aplicable
-        }
\ No newline at end of file
+            'interpretation': interpretation,
+            'age_band': PERCENTILE_ENGINE.band_label(age_weeks),
+            'percentile': 'N/A' if percentile is None else percentile
+        }
+
+
+class VectorizedIMPScorer(IMPScorer):
+    """
+    Calculador de puntuaciones IMP respaldado por NumPy.
+    Devuelve exactamente el mismo diccionario que IMPScorer.calculate_score.
+    """
+
+    @timed('scoring')
+    def calculate_score(self, responses: ParsedResponses) -> Dict[str, Any]:
+        """
+        Calcula todas las puntuaciones con un único producto matricial.
+        """
+        totals, maxima = score_matrix(responses.responses)
+        return scores_to_dict(totals[0], maxima[0])
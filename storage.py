@@ -0,0 +1,234 @@
+# storage.py
+
+"""
+Almacén persistente de evaluaciones IMP sobre SQLite en modo WAL.
+Cada evaluación guarda sus respuestas como un vector int8 empaquetado (un byte por ítem,
+en el orden de ITEM_CATALOG) junto a las puntuaciones ya calculadas, con índices por
+paciente, fecha de evaluación y edad para cargar historiales y cohortes rápidamente.
+"""
+
+import json
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Any, Iterator, List, Optional
+
+import numpy as np
+
+from config import ADDITIONAL_OBSERVATIONS, ITEM_CATALOG, TEST_SECTIONS
+from logging_setup import get_logger
+from scoring import EvaluationResult
+from vector_scoring import MISSING, RESPONSE_DTYPE
+
+logger = get_logger('imp.storage')
+
+SECTION_COLUMNS = tuple(f"section_{section}" for section in TEST_SECTIONS.keys())
+TYPE_COLUMNS = tuple(f"type_{item_type}" for item_type in ITEM_CATALOG.types)
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS evaluations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    patient_id TEXT NOT NULL,
+    evaluation_date TEXT,
+    age_weeks INTEGER,
+    evaluator TEXT,
+    config_hash TEXT NOT NULL,
+    responses BLOB NOT NULL,
+    observations TEXT,
+    {', '.join(f'{column} INTEGER' for column in SECTION_COLUMNS + TYPE_COLUMNS)},
+    observed INTEGER,
+    provoked INTEGER,
+    total INTEGER,
+    scores TEXT NOT NULL,
+    interpretation TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_evaluations_patient ON evaluations (patient_id, evaluation_date);
+CREATE INDEX IF NOT EXISTS idx_evaluations_date ON evaluations (evaluation_date);
+CREATE INDEX IF NOT EXISTS idx_evaluations_age ON evaluations (age_weeks);
+"""
+
+_SUMMARY_COLUMNS = (
+    'id, patient_id, evaluation_date, age_weeks, evaluator, config_hash, responses, '
+    'observations, scores, interpretation, created_at'
+)
+
+
+def unpack_responses(blob: bytes) -> np.ndarray:
+    """Recupera el vector int8 de respuestas guardado por save (MISSING si no hay respuesta)"""
+    return np.frombuffer(blob, dtype=RESPONSE_DTYPE)
+
+
+class EvaluationStore:
+    """
+    Almacén de evaluaciones con un pool de conexiones SQLite reutilizables entre hilos.
+    """
+
+    def __init__(self, path: str, pool_size: int = 4):
+        self.path = path
+        self._pool: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+        for _ in range(pool_size):
+            connection = sqlite3.connect(path, check_same_thread=False, timeout=30)
+            connection.row_factory = sqlite3.Row
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._connections.append(connection)
+            self._pool.put(connection)
+
+        with self._connection() as connection:
+            connection.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        connection = self._pool.get()
+        try:
+            with connection:
+                yield connection
+        finally:
+            self._pool.put(connection)
+
+    def save(self, result: EvaluationResult) -> int:
+        """
+        Guarda una evaluación puntuada y devuelve su ID.
+        """
+        data = result.data
+        scores = result.scores
+        observations = {key: data[key] for key in ADDITIONAL_OBSERVATIONS if data.get(key)}
+
+        row = {
+            'patient_id': str(data.get('patientId', '')),
+            'evaluation_date': data.get('evaluationDate'),
+            'age_weeks': result.age_weeks,
+            'evaluator': data.get('evaluator'),
+            'config_hash': ITEM_CATALOG.config_hash,
+            'responses': result.responses.responses.tobytes(),
+            'observations': json.dumps(observations, ensure_ascii=False),
+            'observed': scores['observed'],
+            'provoked': scores['provoked'],
+            'total': scores['total'],
+            'scores': json.dumps(scores, ensure_ascii=False),
+            'interpretation': result.interpretation,
+            'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds')
+        }
+        for section, column in zip(TEST_SECTIONS.keys(), SECTION_COLUMNS):
+            row[column] = scores[section]
+        for item_type, column in zip(ITEM_CATALOG.types, TYPE_COLUMNS):
+            row[column] = scores['type_scores'][item_type]['total']
+
+        columns = ', '.join(row)
+        placeholders = ', '.join(f':{column}' for column in row)
+        with self._connection() as connection:
+            cursor = connection.execute(
+                f"INSERT INTO evaluations ({columns}) VALUES ({placeholders})", row
+            )
+            return cursor.lastrowid
+
+    def patient_history(self, patient_id: str) -> List[Dict[str, Any]]:
+        """
+        Todas las evaluaciones de un paciente, ordenadas por fecha y edad.
+        """
+        with self._connection() as connection:
+            rows = connection.execute(
+                f"SELECT {_SUMMARY_COLUMNS} FROM evaluations WHERE patient_id = ? "
+                "ORDER BY evaluation_date, age_weeks, id",
+                (str(patient_id),)
+            ).fetchall()
+        return [self._row_to_dict(row) for row in rows]
+
+    def cohort(self, date_from: str = None, date_to: str = None, min_age: int = None,
+               max_age: int = None, evaluator: str = None, limit: int = None) -> List[Dict[str, Any]]:
+        """
+        Evaluaciones filtradas por rango de fechas, rango de edad y/o evaluador.
+        """
+        clauses = []
+        params = []
+        for clause, value in (
+            ('evaluation_date >= ?', date_from),
+            ('evaluation_date <= ?', date_to),
+            ('age_weeks >= ?', min_age),
+            ('age_weeks <= ?', max_age),
+            ('evaluator = ?', evaluator)
+        ):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+
+        query = f"SELECT {_SUMMARY_COLUMNS} FROM evaluations"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY evaluation_date, id"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(int(limit))
+
+        with self._connection() as connection:
+            rows = connection.execute(query, params).fetchall()
+        return [self._row_to_dict(row) for row in rows]
+
+    def get(self, evaluation_id: int) -> Optional[Dict[str, Any]]:
+        with self._connection() as connection:
+            row = connection.execute(
+                f"SELECT {_SUMMARY_COLUMNS} FROM evaluations WHERE id = ?", (int(evaluation_id),)
+            ).fetchone()
+        return None if row is None else self._row_to_dict(row)
+
+    @staticmethod
+    def _row_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            'id': row['id'],
+            'patientId': row['patient_id'],
+            'evaluationDate': row['evaluation_date'],
+            'age_weeks': row['age_weeks'],
+            'evaluator': row['evaluator'],
+            'config_hash': row['config_hash'],
+            'responses': unpack_responses(row['responses']),
+            'observations': json.loads(row['observations'] or '{}'),
+            'scores': json.loads(row['scores']),
+            'interpretation': row['interpretation'],
+            'created_at': row['created_at']
+        }
+
+    @staticmethod
+    def to_form_data(stored: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Reconstruye el diccionario del formulario a partir de una evaluación almacenada.
+        """
+        if stored['config_hash'] != ITEM_CATALOG.config_hash:
+            logger.warning("Evaluación guardada con otra configuración de ítems", evaluation_id=stored['id'],
+                           config_hash=stored['config_hash'])
+
+        data = {
+            'patientId': stored['patientId'],
+            'evaluationDate': stored['evaluationDate'],
+            'age_weeks': '' if stored['age_weeks'] is None else str(stored['age_weeks']),
+            'evaluator': stored['evaluator']
+        }
+        for item_name, value in zip(ITEM_CATALOG.keys, stored['responses'].tolist()):
+            if value != MISSING:
+                data[item_name] = str(value)
+        data.update(stored['observations'])
+        return data
+
+    @staticmethod
+    def to_json(stored: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Versión serializable de una evaluación almacenada, con las respuestas por nombre de ítem.
+        """
+        payload = dict(stored)
+        payload['responses'] = {
+            item_name: value
+            for item_name, value in zip(ITEM_CATALOG.keys, stored['responses'].tolist())
+            if value != MISSING
+        }
+        return payload
+
+    def close(self) -> None:
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections = []
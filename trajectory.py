@@ -0,0 +1,73 @@
+# trajectory.py
+
+"""
+Trayectoria longitudinal de un paciente: puntuaciones total, por sección y por tipo a lo
+largo de la edad postmenstrual, calculadas en una sola pasada vectorizada y superpuestas
+a las bandas de percentiles de AGE_RANGES.
+"""
+
+from typing import Dict, Any, List, Optional, Sequence
+
+import numpy as np
+
+from config import ITEM_CATALOG, VALIDATION_RANGES
+from percentiles import PERCENTILE_ENGINE, PERCENTILE_KEYS
+from vector_scoring import SECTION_COLUMNS, TOTAL_COLUMN, TYPE_COLUMNS, score_matrix
+
+
+def _rounded(values: np.ndarray) -> List[Optional[float]]:
+    return [None if np.isnan(value) else round(float(value), 1) for value in values]
+
+
+def reference_bands() -> Dict[str, List[Optional[float]]]:
+    """
+    Puntos de corte p5–p95 para cada semana del rango de edad admitido (None fuera de banda).
+    """
+    ages = np.arange(VALIDATION_RANGES['age_weeks']['min'], VALIDATION_RANGES['age_weeks']['max'] + 1)
+    bands = {'age_weeks': ages.tolist()}
+    indices = [PERCENTILE_ENGINE.band_index(int(age)) for age in ages]
+    for column, key in enumerate(PERCENTILE_KEYS):
+        bands[key] = [None if index is None else float(PERCENTILE_ENGINE.cutoffs[index, column])
+                      for index in indices]
+    return bands
+
+
+def build_trajectory(responses: np.ndarray, evaluations: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Construye la trayectoria a partir de la matriz de respuestas (N × ítems) y de los datos
+    básicos de cada evaluación (age_weeks, evaluationDate), ordenada por edad.
+    """
+    ages = np.array([float(evaluation['age_weeks']) for evaluation in evaluations], dtype=float)
+    order = np.argsort(ages, kind='stable')
+    ages = ages[order]
+    responses = np.atleast_2d(responses)[order]
+
+    totals, maxima = score_matrix(responses)
+    total = totals[:, TOTAL_COLUMN]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        type_percentages = np.where(
+            maxima[:, TYPE_COLUMNS] > 0,
+            np.round(totals[:, TYPE_COLUMNS] / maxima[:, TYPE_COLUMNS] * 100, 1),
+            0.0
+        )
+    percentiles = PERCENTILE_ENGINE.percentiles(total, ages)
+
+    band_index, in_band = PERCENTILE_ENGINE.band_indices(ages)
+    cutoffs = np.where(in_band[:, None], PERCENTILE_ENGINE.cutoffs[band_index], np.nan)
+
+    return {
+        'evaluationDate': [evaluations[index].get('evaluationDate') for index in order],
+        'age_weeks': [int(age) if age.is_integer() else float(age) for age in ages],
+        'total': total.tolist(),
+        'percentile': _rounded(percentiles),
+        'sections': {
+            section: totals[:, column].tolist()
+            for section, column in zip(ITEM_CATALOG.sections, SECTION_COLUMNS)
+        },
+        'types': {
+            item_type: type_percentages[:, position].tolist()
+            for position, item_type in enumerate(ITEM_CATALOG.types)
+        },
+        'bands': {key: _rounded(cutoffs[:, column]) for column, key in enumerate(PERCENTILE_KEYS)},
+        'reference': reference_bands()
+    }
@@ -0,0 +1,173 @@
+# vector_scoring.py
+
+"""
+Motor de puntuación vectorizado para la escala IMP.
+Cada evaluación se representa como un vector int8 de longitud fija (un valor por ítem,
+en el orden de ITEM_CATALOG) y todas las puntuaciones se obtienen con un único
+producto matricial contra una matriz de pertenencia precalculada.
+"""
+
+from typing import Dict, Any, Iterable, List, Tuple
+
+import numpy as np
+
+from config import ITEM_CATALOG
+
+# Valores centinela: ítem sin respuesta (algunos ítems admiten 0 como respuesta válida),
+# respuesta no numérica y respuesta numérica fuera del rango representable
+MISSING = -1
+NOT_NUMERIC = -2
+OUT_OF_RANGE = -3
+RESPONSE_DTYPE = np.int8
+_RESPONSE_MAX = np.iinfo(RESPONSE_DTYPE).max
+
+# Columnas de la matriz de pertenencia: secciones, tipos, observados, provocados y total
+SECTION_COLUMNS = tuple(range(len(ITEM_CATALOG.sections)))
+TYPE_COLUMNS = tuple(range(len(SECTION_COLUMNS), len(SECTION_COLUMNS) + len(ITEM_CATALOG.types)))
+OBSERVED_COLUMN = len(SECTION_COLUMNS) + len(TYPE_COLUMNS)
+PROVOKED_COLUMN = OBSERVED_COLUMN + 1
+TOTAL_COLUMN = OBSERVED_COLUMN + 2
+
+
+def _build_membership() -> np.ndarray:
+    """
+    Construye la matriz one-hot (ítems × columnas) de pertenencia de cada ítem.
+    """
+    membership = np.zeros((len(ITEM_CATALOG), TOTAL_COLUMN + 1), dtype=np.int32)
+    for pos in range(len(ITEM_CATALOG)):
+        if ITEM_CATALOG.section_index[pos] >= 0:
+            membership[pos, SECTION_COLUMNS[ITEM_CATALOG.section_index[pos]]] = 1
+        membership[pos, TYPE_COLUMNS[ITEM_CATALOG.type_index[pos]]] = 1
+        membership[pos, OBSERVED_COLUMN] = ITEM_CATALOG.observed[pos]
+        membership[pos, PROVOKED_COLUMN] = ITEM_CATALOG.provoked[pos]
+        membership[pos, TOTAL_COLUMN] = 1
+    membership.setflags(write=False)
+    return membership
+
+
+MEMBERSHIP = _build_membership()
+MAX_VALUES = np.array(ITEM_CATALOG.max_values, dtype=np.int32)
+MAX_VALUES.setflags(write=False)
+
+
+def _build_valid_table() -> np.ndarray:
+    """
+    Construye la tabla booleana (ítems × valores int8 no negativos) de respuestas válidas.
+    """
+    table = np.zeros((len(ITEM_CATALOG), _RESPONSE_MAX + 1), dtype=bool)
+    for pos, valid_values in enumerate(ITEM_CATALOG.valid_values):
+        table[pos, sorted(valid_values)] = True
+    table.setflags(write=False)
+    return table
+
+
+VALID_TABLE = _build_valid_table()
+
+
+def parse_responses(data: Dict[str, Any]) -> np.ndarray:
+    """
+    Convierte las respuestas del formulario en un vector int8 en el orden del catálogo,
+    conservando con valores centinela los ítems ausentes, no numéricos o fuera de rango.
+    """
+    vector = np.full(len(ITEM_CATALOG), MISSING, dtype=RESPONSE_DTYPE)
+    for pos, item_name in enumerate(ITEM_CATALOG.keys):
+        raw = data.get(item_name)
+        if raw is None or raw == '':
+            continue
+        try:
+            value = int(raw)
+        except (ValueError, TypeError):
+            vector[pos] = NOT_NUMERIC
+            continue
+        vector[pos] = value if 0 <= value <= _RESPONSE_MAX else OUT_OF_RANGE
+    return vector
+
+
+def response_vector(data: Dict[str, Any]) -> np.ndarray:
+    """
+    Convierte las respuestas del formulario en un vector int8 en el orden del catálogo.
+    Los ítems ausentes, vacíos, no numéricos o fuera del rango int8 quedan como MISSING.
+    """
+    vector = parse_responses(data)
+    vector[vector < MISSING] = MISSING
+    return vector
+
+
+def parse_matrix(records: Iterable[Dict[str, Any]]) -> np.ndarray:
+    """
+    Apila las respuestas de varias evaluaciones, con sus valores centinela, en una matriz (N × ítems).
+    """
+    vectors = [parse_responses(data) for data in records]
+    if not vectors:
+        return np.empty((0, len(ITEM_CATALOG)), dtype=RESPONSE_DTYPE)
+    return np.vstack(vectors)
+
+
+def response_matrix(records: Iterable[Dict[str, Any]]) -> np.ndarray:
+    """
+    Apila los vectores de respuesta de varias evaluaciones en una matriz (N × ítems).
+    """
+    matrix = parse_matrix(records)
+    matrix[matrix < MISSING] = MISSING
+    return matrix
+
+
+def invalid_mask(parsed: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Devuelve dos máscaras (N × ítems): respuestas no numéricas y respuestas con valor no permitido.
+    """
+    parsed = np.atleast_2d(parsed)
+    answered = parsed >= 0
+    columns = np.broadcast_to(np.arange(parsed.shape[1]), parsed.shape)
+    allowed = VALID_TABLE[columns, np.where(answered, parsed, 0)]
+    not_numeric = parsed == NOT_NUMERIC
+    not_allowed = (answered & ~allowed) | (parsed == OUT_OF_RANGE)
+    return not_numeric, not_allowed
+
+
+def score_matrix(responses: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calcula totales y máximos alcanzables por columna para una matriz (N × ítems).
+    Valores y máximos de los ítems respondidos se multiplican en un solo producto matricial.
+    """
+    responses = np.atleast_2d(responses)
+    answered = responses >= 0
+    values = np.where(answered, responses, 0)
+    maxima = answered * MAX_VALUES
+
+    combined = np.concatenate((values, maxima), axis=0) @ MEMBERSHIP
+    count = responses.shape[0]
+    return combined[:count], combined[count:]
+
+
+def scores_to_dict(totals: np.ndarray, maxima: np.ndarray) -> Dict[str, Any]:
+    """
+    Traduce una fila de resultados al mismo diccionario que devuelve IMPScorer.calculate_score.
+    """
+    scores = {}
+    for section, column in zip(ITEM_CATALOG.sections, SECTION_COLUMNS):
+        scores[section] = int(totals[column])
+
+    type_scores = {}
+    for item_type, column in zip(ITEM_CATALOG.types, TYPE_COLUMNS):
+        total = int(totals[column])
+        max_value = int(maxima[column])
+        type_scores[item_type] = {
+            'total': total,
+            'max': max_value,
+            'percentage': round((total / max_value) * 100, 1) if max_value > 0 else 0
+        }
+    scores['type_scores'] = type_scores
+
+    scores['observed'] = int(totals[OBSERVED_COLUMN])
+    scores['provoked'] = int(totals[PROVOKED_COLUMN])
+    scores['total'] = int(totals[TOTAL_COLUMN])
+    return scores
+
+
+def score_responses(responses: np.ndarray) -> List[Dict[str, Any]]:
+    """
+    Puntúa una matriz de respuestas y devuelve un diccionario de puntuaciones por fila.
+    """
+    totals, maxima = score_matrix(responses)
+    return [scores_to_dict(totals[row], maxima[row]) for row in range(totals.shape[0])]
@@ -0,0 +1,18 @@
+# wsgi.py
+
+"""
+Punto de entrada para servidores WSGI de producción.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Con preload_app (activado en gunicorn.conf.py) el módulo se importa una sola vez en el
+proceso maestro, de modo que el catálogo, los estilos de ReportLab y los formularios ya
+renderizados se comparten con los workers por copy-on-write.
+"""
+
+from app import app, preload_caches
+
+preload_caches(app)
+
+# Alias habitual para servidores que buscan `application`
+application = app